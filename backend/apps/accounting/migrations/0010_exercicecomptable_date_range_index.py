@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0009_alter_compteohada_type'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exercicecomptable',
+            index=models.Index(fields=['date_debut', 'date_fin'], name='exercice_plage_dates_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0010_exercicecomptable_date_range_index'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='compteohada',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['code'],
+                name='compte_code_trgm_idx',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='compteohada',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['libelle'],
+                name='compte_libelle_trgm_idx',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ),
+    ]
@@ -2,7 +2,7 @@ from .compte import CompteOHADA
 from .journal import Journal
 from .exercice import ExerciceComptable, PeriodeComptable
 from .tiers import Tiers
-from .ecriture import EcritureComptable, LigneEcriture
+from .ecriture import EcritureComptable, LigneEcriture, montant_en_cents
 
 
 __all__ = [
@@ -12,5 +12,6 @@ __all__ = [
     'PeriodeComptable',
     'Tiers',
     'EcritureComptable',
-    'LigneEcriture'
+    'LigneEcriture',
+    'montant_en_cents'
 ]
\ No newline at end of file
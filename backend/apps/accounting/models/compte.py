@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.core.validators import RegexValidator
 
@@ -48,6 +49,14 @@ class CompteOHADA(models.Model):
         verbose_name = "Compte OHADA"
         verbose_name_plural = "Comptes OHADA"
         ordering = ['code']
+        indexes = [
+            # Index trigrammes : rend les recherches icontains sur le
+            # code et le libellé indexables (pg_trgm)
+            GinIndex(fields=['code'], name='compte_code_trgm_idx',
+                     opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['libelle'], name='compte_libelle_trgm_idx',
+                     opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return f"{self.code} - {self.libelle}"
\ No newline at end of file
@@ -7,6 +7,16 @@ from decimal import Decimal
 from datetime import date
 
 
+def montant_en_cents(montant):
+    """
+    Convertit un montant OHADA (2 décimales) en centimes entiers
+
+    Les comparaisons d'équilibre en centimes (abs(d - c) >= 1) évitent
+    l'arithmétique Decimal en Python pur sur les chemins chauds.
+    """
+    return int((montant or 0) * 100)
+
+
 class EcritureComptable(models.Model):
     """
     En-tête d'écriture comptable selon OHADA
@@ -140,6 +150,14 @@ class EcritureComptable(models.Model):
         if self.periode and not self.periode.is_saisie_possible:
             raise ValidationError("Impossible de saisir sur une période fermée")
 
+        # Cohérence période/exercice : comparaison d'ids FK, aucune
+        # requête supplémentaire une fois la période chargée
+        if self.periode_id and self.exercice_id:
+            if self.periode.exercice_id != self.exercice_id:
+                raise ValidationError(
+                    "La période doit appartenir à l'exercice sélectionné"
+                )
+
         # Vérifier que la date est dans la période
         if self.date_ecriture and self.periode:
             if not (self.periode.date_debut <= self.date_ecriture <= self.periode.date_fin):
@@ -201,15 +219,13 @@ class EcritureComptable(models.Model):
 
     def _calculer_equilibre(self):
         """Calcule l'équilibre de l'écriture"""
-        lignes = self.lignes.all()
-
-        total_debit = lignes.aggregate(
-            total=Sum('montant_debit')
-        )['total'] or Decimal('0')
+        totaux = self.lignes.aggregate(
+            debit=Sum('montant_debit'),
+            credit=Sum('montant_credit')
+        )
 
-        total_credit = lignes.aggregate(
-            total=Sum('montant_credit')
-        )['total'] or Decimal('0')
+        total_debit = totaux['debit'] or Decimal('0')
+        total_credit = totaux['credit'] or Decimal('0')
 
         self.montant_total = total_debit
         self.is_equilibree = (total_debit == total_credit and total_debit > 0)
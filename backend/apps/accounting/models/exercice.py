@@ -4,6 +4,19 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
+from functools import cached_property
+
+# Noms des mois en français, indexés par numéro de mois (1-12)
+MOIS_NOMS = (
+    '', 'Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
+    'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre'
+)
+
+# Statuts d'exercice formatés avec icônes
+STATUT_DISPLAY = {
+    'OUVERT': '🟢 Ouvert',
+    'CLOTURE': '🔴 Clôturé'
+}
 
 
 class ExerciceComptable(models.Model):
@@ -91,6 +104,12 @@ class ExerciceComptable(models.Model):
         verbose_name = "Exercice Comptable"
         verbose_name_plural = "Exercices Comptables"
         ordering = ['-date_debut']
+        indexes = [
+            models.Index(
+                fields=['date_debut', 'date_fin'],
+                name='exercice_plage_dates_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.libelle} ({self.get_statut_display()})"
@@ -127,6 +146,16 @@ class ExerciceComptable(models.Model):
         self.full_clean()
         super().save(*args, **kwargs)
 
+    @cached_property
+    def duree_jours(self):
+        """Durée de l'exercice en jours (bornes incluses)"""
+        return (self.date_fin - self.date_debut).days + 1
+
+    @cached_property
+    def statut_display(self):
+        """Statut formaté avec icônes"""
+        return STATUT_DISPLAY.get(self.statut, self.statut)
+
     @property
     def is_cloture_possible(self):
         """Vérifie si l'exercice peut être clôturé"""
@@ -178,12 +207,13 @@ class ExerciceComptable(models.Model):
             self._creer_periodes_mensuelles()
 
     def _creer_periodes_mensuelles(self):
-        """Crée les 12 périodes mensuelles pour l'exercice"""
+        """Crée les 12 périodes mensuelles pour l'exercice (un seul INSERT)"""
         from calendar import monthrange
 
         # Déterminer l'année de l'exercice
         annee = self.date_debut.year
 
+        periodes = []
         for mois in range(1, 13):
             # Calculer le premier et dernier jour du mois
             date_debut = date(annee, mois, 1)
@@ -196,19 +226,21 @@ class ExerciceComptable(models.Model):
             if date_fin > self.date_fin:
                 date_fin = self.date_fin
 
-            # Créer la période
-            PeriodeComptable.objects.create(
+            periodes.append(PeriodeComptable(
                 exercice=self,
                 numero=mois,
                 date_debut=date_debut,
                 date_fin=date_fin,
                 statut='OUVERTE'
-            )
+            ))
 
             # Si on a atteint la fin de l'exercice
             if date_fin >= self.date_fin:
                 break
 
+        # Insertion groupée : 1 aller-retour au lieu d'un INSERT par mois
+        PeriodeComptable.objects.bulk_create(periodes)
+
     def cloturer_provisoirement(self):
         """Clôture provisoire pour les écritures d'inventaire"""
         if self.statut != 'OUVERT':
@@ -330,6 +362,16 @@ class PeriodeComptable(models.Model):
         self.statut = 'VERROUILLEE'
         self.save()
 
+    @cached_property
+    def mois_libelle(self):
+        """Nom du mois en français basé sur la date de début"""
+        return MOIS_NOMS[self.date_debut.month]
+
+    @cached_property
+    def periode_complete(self):
+        """Libellé complet de la période, ex: Janvier 2025"""
+        return f"{MOIS_NOMS[self.date_debut.month]} {self.date_debut.year}"
+
     @property
     def is_saisie_possible(self):
         """Indique si on peut saisir des écritures sur cette période"""
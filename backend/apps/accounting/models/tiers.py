@@ -3,10 +3,30 @@ from django.db import models
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 from django.db.models import Max
+from functools import cached_property
 import re
 from .compte import CompteOHADA  # Import ajouté
 
 
+def _construire_table_statuts():
+    """Pré-calcule les 8 libellés de statut possibles d'un tiers"""
+    table = {}
+    for is_active in (False, True):
+        for is_bloque in (False, True):
+            for exonere_tva in (False, True):
+                statuts = ["✓ Actif" if is_active else "✗ Inactif"]
+                if is_bloque:
+                    statuts.append("🔒 Bloqué")
+                if exonere_tva:
+                    statuts.append("📋 Exonéré TVA")
+                table[(is_active, is_bloque, exonere_tva)] = " | ".join(statuts)
+    return table
+
+
+# Libellés de statut indexés par (is_active, is_bloque, exonere_tva)
+STATUS_DISPLAY = _construire_table_statuts()
+
+
 class Tiers(models.Model):
     """
     Tiers (auxiliaires) selon le plan OHADA avec codification structurée
@@ -268,6 +288,36 @@ class Tiers(models.Model):
         # Formater avec des zéros
         return f"{self.type_tiers}{prochain_numero:05d}"
 
+    @cached_property
+    def tiers_complet(self):
+        """Code + raison sociale pour affichage
+
+        cached_property (et non property) : les querysets peuvent
+        écraser la valeur avec une annotation Concat calculée en SQL.
+        """
+        return f"{self.code} - {self.raison_sociale}"
+
+    @cached_property
+    def identite_complete(self):
+        """Identité complète avec sigle et matricule"""
+        segments = [self.raison_sociale]
+
+        if self.sigle:
+            segments.append(f" ({self.sigle})")
+
+        if self.type_tiers == 'EMPL' and self.matricule:
+            segments.append(f" - Mat: {self.matricule}")
+
+        if self.numero_contribuable:
+            segments.append(f" - N° Contrib: {self.numero_contribuable}")
+
+        return ''.join(segments)
+
+    @cached_property
+    def status_display(self):
+        """Statut formaté avec icônes (libellés pré-calculés à l'import)"""
+        return STATUS_DISPLAY[(self.is_active, self.is_bloque, self.exonere_tva)]
+
     @property
     def est_fournisseur(self):
         """Indique si c'est un fournisseur"""
@@ -8,27 +8,108 @@ Serializers pour les écritures comptables OHADA
 
 from rest_framework import serializers
 from django.db import transaction
-from django.db.models import Sum, Q
+from django.db.models import Sum, Count, Q, DecimalField
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from datetime import timedelta
 from decimal import Decimal
-import re
+from functools import cached_property
 
 from apps.accounting.models import (
     EcritureComptable, LigneEcriture,
     Journal, ExerciceComptable, PeriodeComptable,
-    CompteOHADA, Tiers
+    CompteOHADA, Tiers, montant_en_cents
 )
 from .base import (
     JournalMinimalSerializer,
     CompteOHADAMinimalSerializer
 )
 from .tiers import TiersMinimalSerializer
+
+# Types d'opération de saisie rapide qui exigent un tiers
+_OPS_REQUIRING_TIERS = frozenset({'ACHAT', 'VENTE', 'ENCAISSEMENT', 'DECAISSEMENT'})
+
+
+def _validate_ligne_attrs(attrs):
+    """
+    Validations croisées d'une ligne d'écriture
+
+    Partagées entre LigneEcritureSerializer et
+    LigneEcritureCreateSerializer.
+    """
+    montant_debit = attrs.get('montant_debit', Decimal('0'))
+    montant_credit = attrs.get('montant_credit', Decimal('0'))
+
+    # Validation : un seul montant non nul
+    if montant_debit > 0 and montant_credit > 0:
+        raise serializers.ValidationError({
+            'montant_credit': "Une ligne ne peut avoir à la fois un débit et un crédit"
+        })
+
+    if montant_debit == 0 and montant_credit == 0:
+        raise serializers.ValidationError({
+            'montant_debit': "Au moins un montant doit être spécifié"
+        })
+
+    # Validation des montants négatifs
+    if montant_debit < 0 or montant_credit < 0:
+        raise serializers.ValidationError("Les montants doivent être positifs")
+
+    # Cohérence tiers / compte collectif (classe 4) : même règle que
+    # LigneEcriture.clean(), qui n'est plus déclenchée depuis que les
+    # lignes sont persistées par bulk_create
+    compte = attrs.get('compte')
+    tiers = attrs.get('tiers')
+    if tiers and compte and compte.classe == '4':
+        if not compte.code.startswith(tiers.compte_collectif.code[:4]):
+            raise serializers.ValidationError({
+                'compte': f"Le compte {compte.code} ne correspond pas au tiers {tiers.code}"
+            })
+
+    return attrs
 from .exercices import (
     ExerciceComptableMinimalSerializer,
     PeriodeComptableMinimalSerializer
 )
 
 
+class LigneEcritureListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer qui charge comptes et tiers en deux requêtes
+
+    Sans prefetch, la sérialisation de N lignes déclenche une requête
+    par compte et par tiers. On matérialise la liste une fois, on
+    charge les relations manquantes en bloc puis on remplit le cache
+    de champs Django pour que les serializers imbriqués ne touchent
+    plus la base.
+    """
+
+    def to_representation(self, data):
+        lignes = list(data.all()) if hasattr(data, 'all') else list(data)
+
+        compte_ids = {
+            ligne.compte_id for ligne in lignes
+            if ligne.compte_id and 'compte' not in ligne._state.fields_cache
+        }
+        if compte_ids:
+            compte_map = CompteOHADA.objects.in_bulk(compte_ids)
+            for ligne in lignes:
+                if ligne.compte_id in compte_map:
+                    ligne._state.fields_cache['compte'] = compte_map[ligne.compte_id]
+
+        tiers_ids = {
+            ligne.tiers_id for ligne in lignes
+            if ligne.tiers_id and 'tiers' not in ligne._state.fields_cache
+        }
+        if tiers_ids:
+            tiers_map = Tiers.objects.in_bulk(tiers_ids)
+            for ligne in lignes:
+                if ligne.tiers_id in tiers_map:
+                    ligne._state.fields_cache['tiers'] = tiers_map[ligne.tiers_id]
+
+        return super().to_representation(lignes)
+
+
 class LigneEcritureSerializer(serializers.ModelSerializer):
     """
     Serializer pour les lignes d'écriture comptable
@@ -72,18 +153,35 @@ class LigneEcritureSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['numero_ligne', 'is_lettree', 'created_at', 'updated_at']
+        list_serializer_class = LigneEcritureListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Cache (sens, montant) par objet : un seul test de montant par
+        # ligne au lieu de deux comparaisons Decimal par champ rendu
+        self._sens_cache = {}
+
+    def _sens_montant(self, obj):
+        """Détermine le sens et le montant non nul en un seul test"""
+        key = id(obj)
+        cached = self._sens_cache.get(key)
+        if cached is None:
+            debit = obj.montant_debit
+            if debit:
+                cached = ('D', debit)
+            else:
+                credit = obj.montant_credit
+                cached = ('C' if credit else None, credit)
+            self._sens_cache[key] = cached
+        return cached
 
     def get_sens(self, obj):
         """Retourne 'D' pour débit, 'C' pour crédit"""
-        if obj.montant_debit > 0:
-            return 'D'
-        elif obj.montant_credit > 0:
-            return 'C'
-        return None
+        return self._sens_montant(obj)[0]
 
     def get_montant(self, obj):
         """Retourne le montant non nul"""
-        return obj.montant_debit if obj.montant_debit > 0 else obj.montant_credit
+        return self._sens_montant(obj)[1]
 
     def get_lettrage_complet(self, obj):
         """Retourne le code de lettrage complet si lettré"""
@@ -105,36 +203,7 @@ class LigneEcritureSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         """Validations croisées"""
-        montant_debit = attrs.get('montant_debit', Decimal('0'))
-        montant_credit = attrs.get('montant_credit', Decimal('0'))
-        compte = attrs.get('compte')
-        tiers = attrs.get('tiers')
-
-        # Validation : un seul montant non nul
-        if montant_debit > 0 and montant_credit > 0:
-            raise serializers.ValidationError({
-                'montant_credit': "Une ligne ne peut avoir à la fois un débit et un crédit"
-            })
-
-        if montant_debit == 0 and montant_credit == 0:
-            raise serializers.ValidationError({
-                'montant_debit': "Au moins un montant doit être spécifié"
-            })
-
-        # Validation des montants négatifs
-        if montant_debit < 0 or montant_credit < 0:
-            raise serializers.ValidationError("Les montants doivent être positifs")
-
-        # Validation tiers pour comptes de tiers (classes 4)
-        if compte and compte.classe == '4':
-            # Pour certains comptes de classe 4, le tiers est recommandé
-            comptes_tiers = ['401', '411', '421']  # Fournisseurs, Clients, Personnel
-            if any(compte.code.startswith(prefix) for prefix in comptes_tiers):
-                if not tiers:
-                    # Warning plutôt qu'erreur pour plus de flexibilité
-                    pass  # On pourrait logger un warning ici
-
-        return attrs
+        return _validate_ligne_attrs(attrs)
 
 
 class LigneEcritureCreateSerializer(serializers.ModelSerializer):
@@ -157,7 +226,7 @@ class LigneEcritureCreateSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         # Mêmes validations que le serializer principal
-        return LigneEcritureSerializer.validate(self, attrs)
+        return _validate_ligne_attrs(attrs)
 
 
 class EcritureComptableSerializer(serializers.ModelSerializer):
@@ -171,6 +240,13 @@ class EcritureComptableSerializer(serializers.ModelSerializer):
     - Gestion des lignes d'écriture
     """
 
+    # Libellés de statut avec icône, construits une seule fois
+    _STATUT_ICONS = {
+        'BROUILLON': '📝 Brouillon',
+        'VALIDEE': '✅ Validée',
+        'CLOTUREE': '🔒 Clôturée'
+    }
+
     # Relations
     journal_detail = JournalMinimalSerializer(source='journal', read_only=True)
     exercice_detail = ExerciceComptableMinimalSerializer(source='exercice', read_only=True)
@@ -227,19 +303,63 @@ class EcritureComptableSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Cache des totaux par objet : évite de recalculer les sommes
+        # pour get_is_equilibree et get_ecart qui les réutilisent
+        self._totals_cache = {}
+
+    @classmethod
+    def annotate_queryset(cls, queryset):
+        """
+        Annote le queryset avec les totaux des lignes
+
+        À appeler dans get_queryset() du viewset pour que la liste
+        soit rendue sans requête supplémentaire par écriture.
+        """
+        return queryset.annotate(
+            _total_debit=Coalesce(
+                Sum('lignes__montant_debit'),
+                Decimal('0'),
+                output_field=DecimalField()
+            ),
+            _total_credit=Coalesce(
+                Sum('lignes__montant_credit'),
+                Decimal('0'),
+                output_field=DecimalField()
+            ),
+            _nb_lignes=Count('lignes')
+        )
+
+    def _compute_totals(self, obj):
+        """Calcule débit et crédit en une seule requête (si non annotés)"""
+        debit = getattr(obj, '_total_debit', None)
+        credit = getattr(obj, '_total_credit', None)
+
+        if debit is None or credit is None:
+            totaux = obj.lignes.aggregate(
+                debit=Sum('montant_debit'),
+                credit=Sum('montant_credit')
+            )
+            debit, credit = totaux['debit'], totaux['credit']
+
+        return {'debit': float(debit or 0), 'credit': float(credit or 0)}
+
+    def _get_totals(self, obj):
+        """Totaux mémorisés par objet pour la durée de la sérialisation"""
+        key = id(obj)
+        totaux = self._totals_cache.get(key)
+        if totaux is None:
+            totaux = self._totals_cache[key] = self._compute_totals(obj)
+        return totaux
+
     def get_total_debit(self, obj):
-        """Somme des débits"""
-        if hasattr(obj, 'lignes'):
-            total = obj.lignes.aggregate(total=Sum('montant_debit'))['total']
-            return float(total or 0)
-        return 0
+        """Somme des débits (annotation si disponible)"""
+        return self._get_totals(obj)['debit']
 
     def get_total_credit(self, obj):
-        """Somme des crédits"""
-        if hasattr(obj, 'lignes'):
-            total = obj.lignes.aggregate(total=Sum('montant_credit'))['total']
-            return float(total or 0)
-        return 0
+        """Somme des crédits (annotation si disponible)"""
+        return self._get_totals(obj)['credit']
 
     def get_is_equilibree(self, obj):
         """Vérifie si l'écriture est équilibrée"""
@@ -250,17 +370,15 @@ class EcritureComptableSerializer(serializers.ModelSerializer):
         return self.get_total_debit(obj) - self.get_total_credit(obj)
 
     def get_nb_lignes(self, obj):
-        """Nombre de lignes"""
-        return obj.lignes.count() if hasattr(obj, 'lignes') else 0
+        """Nombre de lignes (annotation si disponible)"""
+        nb = getattr(obj, '_nb_lignes', None)
+        if nb is None:
+            nb = obj.lignes.count()
+        return nb
 
     def get_statut_display(self, obj):
         """Statut avec icône"""
-        statuts = {
-            'BROUILLON': '📝 Brouillon',
-            'VALIDEE': '✅ Validée',
-            'CLOTUREE': '🔒 Clôturée'
-        }
-        return statuts.get(obj.statut, obj.statut)
+        return self._STATUT_ICONS.get(obj.statut, obj.statut)
 
     def validate_journal(self, value):
         """Validation du journal"""
@@ -280,9 +398,14 @@ class EcritureComptableSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("La période doit être ouverte")
         return value
 
+    @cached_property
+    def _today(self):
+        """Date du jour, calculée une fois par instance de serializer"""
+        return timezone.now().date()
+
     def validate_date_ecriture(self, value):
         """Validation de la date d'écriture"""
-        if value > timezone.now().date():
+        if value > self._today:
             raise serializers.ValidationError("La date ne peut pas être dans le futur")
         return value
 
@@ -294,15 +417,19 @@ class EcritureComptableSerializer(serializers.ModelSerializer):
         if len(value) < 2:
             raise serializers.ValidationError("Une écriture doit avoir au moins 2 lignes")
 
-        # Calculer l'équilibre
-        total_debit = sum(ligne.get('montant_debit', 0) for ligne in value)
-        total_credit = sum(ligne.get('montant_credit', 0) for ligne in value)
+        # Calculer l'équilibre en une seule passe, en centimes entiers
+        # (additions C-level au lieu d'une addition Decimal par ligne)
+        debit_cents = credit_cents = 0
+        for ligne in value:
+            debit_cents += int((ligne.get('montant_debit') or 0) * 100)
+            credit_cents += int((ligne.get('montant_credit') or 0) * 100)
 
-        if abs(total_debit - total_credit) >= 0.01:
+        if abs(debit_cents - credit_cents) >= 1:
             raise serializers.ValidationError(
                 f"L'écriture n'est pas équilibrée. "
-                f"Débit: {total_debit:,.2f}, Crédit: {total_credit:,.2f}, "
-                f"Écart: {abs(total_debit - total_credit):,.2f}"
+                f"Débit: {debit_cents / 100:,.2f}, "
+                f"Crédit: {credit_cents / 100:,.2f}, "
+                f"Écart: {abs(debit_cents - credit_cents) / 100:,.2f}"
             )
 
         return value
@@ -338,13 +465,27 @@ class EcritureComptableSerializer(serializers.ModelSerializer):
         # Créer l'écriture
         ecriture = super().create(validated_data)
 
-        # Créer les lignes
+        # Créer les lignes en un seul INSERT multi-lignes
+        lignes = []
         for index, ligne_data in enumerate(lignes_data, 1):
-            LigneEcriture.objects.create(
+            ligne = LigneEcriture(
                 ecriture=ecriture,
                 numero_ligne=index,
                 **ligne_data
             )
+            # Automatismes normalement appliqués par LigneEcriture.save()
+            if not ligne.libelle:
+                ligne.libelle = ecriture.libelle
+            if ligne.tiers and not ligne.date_echeance:
+                ligne.date_echeance = ecriture.date_ecriture + timedelta(
+                    days=ligne.tiers.delai_paiement
+                )
+            lignes.append(ligne)
+
+        LigneEcriture.objects.bulk_create(lignes)
+
+        # Un seul recalcul d'équilibre au lieu d'un par ligne
+        ecriture._calculer_equilibre()
 
         return ecriture
 
@@ -367,7 +508,9 @@ class EcritureComptableMinimalSerializer(serializers.ModelSerializer):
     """Serializer minimal pour les listes"""
 
     journal_code = serializers.CharField(source='journal.code', read_only=True)
-    is_equilibree = serializers.SerializerMethodField()
+    # Champ dénormalisé maintenu par _calculer_equilibre : lecture directe,
+    # pas de SerializerMethodField ni de valeur par défaut silencieuse
+    is_equilibree = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = EcritureComptable
@@ -381,12 +524,6 @@ class EcritureComptableMinimalSerializer(serializers.ModelSerializer):
             'is_equilibree'
         ]
 
-    def get_is_equilibree(self, obj):
-        """Vérifie l'équilibre rapidement"""
-        if hasattr(obj, '_is_equilibree'):
-            return obj._is_equilibree
-        return True  # Par défaut on suppose équilibré
-
 
 class EcritureComptableStatsSerializer(serializers.ModelSerializer):
     """Serializer avec statistiques détaillées"""
@@ -429,16 +566,20 @@ class EcritureComptableStatsSerializer(serializers.ModelSerializer):
         return obj.lignes.count()
 
     def get_comptes_utilises(self, obj):
-        """Liste des comptes utilisés"""
-        comptes = obj.lignes.values_list('compte__code', 'compte__libelle').distinct()
-        return [{'code': code, 'libelle': libelle} for code, libelle in comptes]
+        """Liste des comptes utilisés (sur les lignes préfetchées)"""
+        comptes = {
+            (ligne.compte.code, ligne.compte.libelle)
+            for ligne in obj.lignes.all()
+        }
+        return [{'code': code, 'libelle': libelle} for code, libelle in sorted(comptes)]
 
     def get_tiers_impliques(self, obj):
-        """Liste des tiers impliqués"""
-        tiers = obj.lignes.exclude(tiers__isnull=True).values_list(
-            'tiers__code', 'tiers__raison_sociale'
-        ).distinct()
-        return [{'code': code, 'raison_sociale': rs} for code, rs in tiers]
+        """Liste des tiers impliqués (sur les lignes préfetchées)"""
+        tiers = {
+            (ligne.tiers.code, ligne.tiers.raison_sociale)
+            for ligne in obj.lignes.all() if ligne.tiers_id
+        }
+        return [{'code': code, 'raison_sociale': rs} for code, rs in sorted(tiers)]
 
 
 class ValidationEcritureSerializer(serializers.Serializer):
@@ -450,10 +591,14 @@ class ValidationEcritureSerializer(serializers.Serializer):
     ecriture_id = serializers.IntegerField()
 
     def validate_ecriture_id(self, value):
-        """Vérifier que l'écriture peut être validée"""
-        try:
-            ecriture = EcritureComptable.objects.get(id=value)
-        except EcritureComptable.DoesNotExist:
+        """Vérifier que l'écriture peut être validée (une seule requête)"""
+        ecriture = EcritureComptable.objects.filter(id=value).annotate(
+            _total_debit=Sum('lignes__montant_debit'),
+            _total_credit=Sum('lignes__montant_credit'),
+            _nb_lignes=Count('lignes')
+        ).first()
+
+        if ecriture is None:
             raise serializers.ValidationError("Écriture introuvable")
 
         if ecriture.statut != 'BROUILLON':
@@ -461,21 +606,26 @@ class ValidationEcritureSerializer(serializers.Serializer):
                 f"L'écriture est déjà {ecriture.get_statut_display()}"
             )
 
-        # Vérifier l'équilibre
-        total_debit = ecriture.lignes.aggregate(total=Sum('montant_debit'))['total'] or 0
-        total_credit = ecriture.lignes.aggregate(total=Sum('montant_credit'))['total'] or 0
+        # Vérifier l'équilibre (comparaison en centimes entiers)
+        ecart_cents = abs(
+            montant_en_cents(ecriture._total_debit)
+            - montant_en_cents(ecriture._total_credit)
+        )
 
-        if abs(total_debit - total_credit) >= 0.01:
+        if ecart_cents >= 1:
             raise serializers.ValidationError(
-                f"L'écriture n'est pas équilibrée. Écart: {abs(total_debit - total_credit):,.2f}"
+                f"L'écriture n'est pas équilibrée. Écart: {ecart_cents / 100:,.2f}"
             )
 
         # Vérifier qu'il y a au moins 2 lignes
-        if ecriture.lignes.count() < 2:
+        if ecriture._nb_lignes < 2:
             raise serializers.ValidationError(
                 "Une écriture doit avoir au moins 2 lignes"
             )
 
+        # Écriture mise à disposition de la vue pour éviter un re-fetch
+        self.context['ecriture'] = ecriture
+
         return value
 
 
@@ -503,22 +653,34 @@ class SaisieRapideSerializer(serializers.Serializer):
         default=Decimal('18.00')
     )
     tiers = serializers.PrimaryKeyRelatedField(
-        queryset=Tiers.objects.filter(is_active=True),
+        queryset=Tiers.objects.all(),
         required=False
     )
     libelle = serializers.CharField(max_length=255)
     reference = serializers.CharField(max_length=100, required=False)
     compte_charge_produit = serializers.PrimaryKeyRelatedField(
-        queryset=CompteOHADA.objects.filter(is_active=True),
+        queryset=CompteOHADA.objects.all(),
         required=False
     )
 
+    def validate_tiers(self, value):
+        """Validation du tiers"""
+        if value and not value.is_active:
+            raise serializers.ValidationError("Le tiers doit être actif")
+        return value
+
+    def validate_compte_charge_produit(self, value):
+        """Validation du compte de charge/produit"""
+        if value and not value.is_active:
+            raise serializers.ValidationError("Le compte doit être actif")
+        return value
+
     def validate(self, attrs):
         """Générer les lignes d'écriture selon le type"""
         type_op = attrs['type_operation']
 
         # Vérifications spécifiques par type
-        if type_op in ['ACHAT', 'VENTE', 'ENCAISSEMENT', 'DECAISSEMENT'] and not attrs.get('tiers'):
+        if type_op in _OPS_REQUIRING_TIERS and not attrs.get('tiers'):
             raise serializers.ValidationError({
                 'tiers': f"Le tiers est obligatoire pour une opération de type {type_op}"
             })
@@ -7,8 +7,11 @@ Serializers pour les exercices et périodes comptables OHADA
 
 from rest_framework import serializers
 from django.utils import timezone
-from django.db.models import Count, Q
+from django.db.models import Count, Exists, OuterRef, Q, Sum, Value
+from django.db.models.functions import Coalesce
 from datetime import date, timedelta
+from decimal import Decimal
+from functools import cached_property
 
 from apps.accounting.models import ExerciceComptable, PeriodeComptable
 
@@ -24,9 +27,10 @@ class PeriodeComptableSerializer(serializers.ModelSerializer):
     - Statistiques d'utilisation
     """
 
-    # Champs calculés
-    mois_libelle = serializers.SerializerMethodField()
-    periode_complete = serializers.SerializerMethodField()
+    # Champs calculés (mois_libelle et periode_complete sont des
+    # cached_property du modèle : lecture directe sans dispatch de méthode)
+    mois_libelle = serializers.ReadOnlyField()
+    periode_complete = serializers.ReadOnlyField()
     nb_ecritures = serializers.SerializerMethodField()
     peut_etre_cloturee = serializers.SerializerMethodField()
     jours_restants = serializers.SerializerMethodField()
@@ -50,24 +54,27 @@ class PeriodeComptableSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['numero', 'date_cloture', 'cloture_par']
 
-    def get_mois_libelle(self, obj):
-        """Retourne le nom du mois en français basé sur la date"""
-        mois_noms = {
-            1: 'Janvier', 2: 'Février', 3: 'Mars', 4: 'Avril',
-            5: 'Mai', 6: 'Juin', 7: 'Juillet', 8: 'Août',
-            9: 'Septembre', 10: 'Octobre', 11: 'Novembre', 12: 'Décembre'
-        }
-        return mois_noms.get(obj.date_debut.month, '')
+    @classmethod
+    def annotate_queryset(cls, queryset):
+        """
+        Annote le queryset avec le nombre d'écritures par période
 
-    def get_periode_complete(self, obj):
-        """Retourne le libellé complet de la période"""
-        return f"{self.get_mois_libelle(obj)} {obj.date_debut.year}"
+        À appeler dans get_queryset() du viewset pour que la liste
+        soit rendue sans COUNT supplémentaire par période.
+        """
+        return queryset.annotate(_nb_ecritures=Count('ecritures'))
+
+    @cached_property
+    def _today(self):
+        """Date du jour, calculée une fois par instance de serializer"""
+        return timezone.now().date()
 
     def get_nb_ecritures(self, obj):
-        """Nombre d'écritures dans cette période"""
-        if hasattr(obj, 'ecritures'):
-            return obj.ecritures.count()
-        return 0
+        """Nombre d'écritures dans cette période (annotation si disponible)"""
+        nb = getattr(obj, '_nb_ecritures', None)
+        if nb is None:
+            nb = obj.ecritures.count()
+        return nb
 
     def get_peut_etre_cloturee(self, obj):
         """Vérifie si la période peut être clôturée"""
@@ -75,15 +82,14 @@ class PeriodeComptableSerializer(serializers.ModelSerializer):
             return False
 
         # Une période peut être clôturée si on est après sa date de fin
-        return timezone.now().date() > obj.date_fin
+        return self._today > obj.date_fin
 
     def get_jours_restants(self, obj):
         """Nombre de jours avant la fin de la période"""
         if obj.statut == 'CLOTUREE':
             return 0
 
-        delta = obj.date_fin - timezone.now().date()
-        return max(0, delta.days)
+        return max(0, (obj.date_fin - self._today).days)
 
     def validate(self, attrs):
         """Validations métier"""
@@ -110,22 +116,12 @@ class PeriodeComptableSerializer(serializers.ModelSerializer):
 class PeriodeComptableMinimalSerializer(serializers.ModelSerializer):
     """Serializer minimal pour les listes déroulantes"""
 
-    periode_complete = serializers.SerializerMethodField()
+    periode_complete = serializers.ReadOnlyField()
 
     class Meta:
         model = PeriodeComptable
         fields = ['id', 'numero', 'date_debut', 'date_fin', 'periode_complete', 'statut']
 
-    def get_periode_complete(self, obj):
-        mois_noms = {
-            1: 'Janvier', 2: 'Février', 3: 'Mars', 4: 'Avril',
-            5: 'Mai', 6: 'Juin', 7: 'Juillet', 8: 'Août',
-            9: 'Septembre', 10: 'Octobre', 11: 'Novembre', 12: 'Décembre'
-        }
-        mois = obj.date_debut.month
-        annee = obj.date_debut.year
-        return f"{mois_noms.get(mois, '')} {annee}"
-
 
 class ExerciceComptableSerializer(serializers.ModelSerializer):
     """
@@ -141,14 +137,15 @@ class ExerciceComptableSerializer(serializers.ModelSerializer):
     # Relations
     periodes = PeriodeComptableMinimalSerializer(many=True, read_only=True)
 
-    # Champs calculés
-    duree_jours = serializers.SerializerMethodField()
+    # Champs calculés (duree_jours et statut_display sont des
+    # cached_property du modèle : lecture directe sans dispatch de méthode)
+    duree_jours = serializers.ReadOnlyField()
     duree_mois = serializers.SerializerMethodField()
     progression_pourcent = serializers.SerializerMethodField()
     nb_periodes_cloturees = serializers.SerializerMethodField()
     nb_ecritures_total = serializers.SerializerMethodField()
     peut_etre_cloture = serializers.SerializerMethodField()
-    statut_display = serializers.SerializerMethodField()
+    statut_display = serializers.ReadOnlyField()
 
     class Meta:
         model = ExerciceComptable
@@ -183,60 +180,99 @@ class ExerciceComptableSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
 
-    def get_duree_jours(self, obj):
-        """Durée de l'exercice en jours"""
-        return (obj.date_fin - obj.date_debut).days + 1
+    def __init__(self, *args, **kwargs):
+        # Sélection dynamique des champs : fields=['id', 'libelle', ...]
+        # permet d'éviter le calcul des champs coûteux non demandés
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            demandes = set(fields)
+            for nom in set(self.fields) - demandes:
+                self.fields.pop(nom)
+        elif not self.context.get('include_periodes'):
+            # Les périodes imbriquées ne sont rendues que sur demande
+            # (?include=periodes) : elles multiplient le coût des listes
+            self.fields.pop('periodes', None)
+
+    @cached_property
+    def _today(self):
+        """Date du jour, calculée une fois par instance de serializer"""
+        return timezone.now().date()
+
+    @classmethod
+    def annotate_queryset(cls, queryset):
+        """
+        Annote le queryset avec les compteurs de périodes et d'écritures
+
+        À appeler dans get_queryset() du viewset pour que la liste
+        soit rendue sans COUNT supplémentaire par exercice.
+        """
+        return queryset.annotate(
+            _nb_periodes_cloturees=Count(
+                'periodes',
+                filter=Q(periodes__statut='CLOTUREE'),
+                distinct=True
+            ),
+            _has_open_periode=Exists(
+                PeriodeComptable.objects.filter(
+                    exercice=OuterRef('pk')
+                ).exclude(statut='CLOTUREE')
+            ),
+            _nb_ecritures=Count('ecritures', distinct=True)
+        )
 
     def get_duree_mois(self, obj):
-        """Durée approximative en mois"""
-        return round(self.get_duree_jours(obj) / 30.44)
+        """Durée en mois calendaires (arithmétique entière, bornes incluses)"""
+        return ((obj.date_fin.year - obj.date_debut.year) * 12
+                + obj.date_fin.month - obj.date_debut.month + 1)
 
     def get_progression_pourcent(self, obj):
         """Pourcentage de progression de l'exercice"""
         if obj.statut == 'CLOTURE':
             return 100
 
-        today = timezone.now().date()
-        if today < obj.date_debut:
+        # Comparaisons sur ordinaux : une seule conversion par date,
+        # aucun timedelta intermédiaire
+        today = self._today.toordinal()
+        debut = obj.date_debut.toordinal()
+        if today < debut:
             return 0
-        elif today > obj.date_fin:
+        fin = obj.date_fin.toordinal()
+        if today > fin:
             return 100
 
-        jours_ecoules = (today - obj.date_debut).days
-        jours_total = self.get_duree_jours(obj)
-
-        return round((jours_ecoules / jours_total) * 100, 1)
+        return round(((today - debut) / (fin - debut + 1)) * 100, 1)
 
     def get_nb_periodes_cloturees(self, obj):
-        """Nombre de périodes clôturées"""
-        return obj.periodes.filter(statut='CLOTUREE').count()
+        """Nombre de périodes clôturées (annotation si disponible)"""
+        nb = getattr(obj, '_nb_periodes_cloturees', None)
+        if nb is None:
+            nb = obj.periodes.filter(statut='CLOTUREE').count()
+        return nb
 
     def get_nb_ecritures_total(self, obj):
-        """Nombre total d'écritures dans l'exercice"""
-        if hasattr(obj, 'ecritures'):
-            return obj.ecritures.count()
-        return 0
+        """Nombre total d'écritures dans l'exercice (annotation si disponible)"""
+        nb = getattr(obj, '_nb_ecritures', None)
+        if nb is None:
+            nb = obj.ecritures.count()
+        return nb
 
     def get_peut_etre_cloture(self, obj):
         """Vérifie si l'exercice peut être clôturé"""
         if obj.statut == 'CLOTURE':
             return False
 
-        # Vérifier que toutes les périodes sont clôturées
-        periodes_ouvertes = obj.periodes.exclude(statut='CLOTUREE').count()
-        if periodes_ouvertes > 0:
+        # Vérifier que toutes les périodes sont clôturées (EXISTS annoté
+        # par le queryset, recalculé à la demande sinon)
+        has_open = getattr(obj, '_has_open_periode', None)
+        if has_open is None:
+            has_open = obj.periodes.exclude(statut='CLOTUREE').exists()
+        if has_open:
             return False
 
         # Vérifier qu'on est après la date de fin
-        return timezone.now().date() > obj.date_fin
-
-    def get_statut_display(self, obj):
-        """Statut formaté avec icônes"""
-        statuts = {
-            'OUVERT': '🟢 Ouvert',
-            'CLOTURE': '🔴 Clôturé'
-        }
-        return statuts.get(obj.statut, obj.statut)
+        return self._today > obj.date_fin
 
     def validate_libelle(self, value):
         """Validation du libellé"""
@@ -251,16 +287,16 @@ class ExerciceComptableSerializer(serializers.ModelSerializer):
         # Pour un nouvel exercice, vérifier qu'il n'y a pas de chevauchement DE DATES
         if not self.instance:  # Création
             # Vérifier uniquement le chevauchement de dates, pas le statut
-            exercices_chevauchants = ExerciceComptable.objects.filter(
+            # (une seule requête : le premier chevauchant sert au message)
+            exercice = ExerciceComptable.objects.filter(
                 date_debut__lte=value,
                 date_fin__gte=value
-            )
+            ).values('libelle', 'date_debut', 'date_fin').first()
 
-            if exercices_chevauchants.exists():
-                exercice = exercices_chevauchants.first()
+            if exercice:
                 raise serializers.ValidationError(
-                    f"La date chevauche avec l'exercice {exercice.libelle} "
-                    f"({exercice.date_debut} - {exercice.date_fin})"
+                    f"La date chevauche avec l'exercice {exercice['libelle']} "
+                    f"({exercice['date_debut']} - {exercice['date_fin']})"
                 )
 
         return value
@@ -287,16 +323,31 @@ class ExerciceComptableSerializer(serializers.ModelSerializer):
                 })
 
             # Vérifier le chevauchement complet (date début ET fin)
-            if not self.instance:  # Création uniquement
-                exercices_chevauchants = ExerciceComptable.objects.filter(
-                    Q(date_debut__lte=date_fin, date_fin__gte=date_debut)
+            # En création, les deux contrôles (chevauchement + nb d'exercices
+            # ouverts) sont poussés dans un seul aller-retour SQL
+            if not self.instance:
+                controles = ExerciceComptable.objects.aggregate(
+                    nb_chevauchants=Count(
+                        'pk',
+                        filter=Q(date_debut__lte=date_fin, date_fin__gte=date_debut)
+                    ),
+                    nb_ouverts=Count('pk', filter=Q(statut='OUVERT'))
                 )
-                if exercices_chevauchants.exists():
-                    exercice = exercices_chevauchants.first()
+                if controles['nb_chevauchants']:
+                    exercice = ExerciceComptable.objects.filter(
+                        Q(date_debut__lte=date_fin, date_fin__gte=date_debut)
+                    ).values('libelle').first()
                     raise serializers.ValidationError({
-                        'date_fin': f"Les dates chevauchent avec l'exercice {exercice.libelle}"
+                        'date_fin': f"Les dates chevauchent avec l'exercice {exercice['libelle']}"
                     })
 
+                statut = attrs.get('statut', 'OUVERT')
+                if statut == 'OUVERT' and controles['nb_ouverts'] >= 2:
+                    raise serializers.ValidationError({
+                        'statut': "Maximum 2 exercices peuvent être ouverts simultanément"
+                    })
+                return attrs
+
         # Validation du statut - Maximum 2 exercices ouverts
         statut = attrs.get('statut', self.instance.statut if self.instance else 'OUVERT')
         if statut == 'OUVERT':
@@ -304,7 +355,8 @@ class ExerciceComptableSerializer(serializers.ModelSerializer):
             if self.instance:
                 nb_ouverts = nb_ouverts.exclude(pk=self.instance.pk)
 
-            if nb_ouverts.count() >= 2:
+            # Borner le COUNT : seuls les 2 premiers ids nous intéressent
+            if len(nb_ouverts.values_list('pk', flat=True)[:2]) >= 2:
                 raise serializers.ValidationError({
                     'statut': "Maximum 2 exercices peuvent être ouverts simultanément"
                 })
@@ -366,44 +418,58 @@ class ExerciceComptableStatsSerializer(serializers.ModelSerializer):
             'periodes_details'
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Statistiques mémorisées par objet : deux requêtes par exercice
+        # au lieu d'une par champ calculé
+        self._stats_cache = {}
+
+        # Le détail des périodes n'est rendu que sur demande explicite
+        # (?include=periodes_details) : chaque période sérialisée a un coût
+        if not self.context.get('include_periodes_details'):
+            self.fields.pop('periodes_details', None)
+
+    def _get_stats(self, obj):
+        """Statistiques agrégées de l'exercice, calculées une fois par objet"""
+        key = id(obj)
+        stats = self._stats_cache.get(key)
+        if stats is None:
+            stats = obj.periodes.aggregate(
+                nb_total=Count('id'),
+                nb_ouvertes=Count('id', filter=Q(statut='OUVERTE')),
+                nb_cloturees=Count('id', filter=Q(statut='CLOTUREE'))
+            )
+            stats.update(obj.ecritures.aggregate(
+                nb_brouillon=Count('id', distinct=True, filter=Q(statut='BROUILLON')),
+                nb_validees=Count('id', distinct=True, filter=Q(statut='VALIDEE')),
+                total_debits=Coalesce(Sum('lignes__montant_debit'), Value(Decimal('0'))),
+                total_credits=Coalesce(Sum('lignes__montant_credit'), Value(Decimal('0')))
+            ))
+            self._stats_cache[key] = stats
+        return stats
+
     def get_nb_periodes_total(self, obj):
-        return obj.periodes.count()
+        return self._get_stats(obj)['nb_total']
 
     def get_nb_periodes_ouvertes(self, obj):
-        return obj.periodes.filter(statut='OUVERTE').count()
+        return self._get_stats(obj)['nb_ouvertes']
 
     def get_nb_periodes_cloturees(self, obj):
-        return obj.periodes.filter(statut='CLOTUREE').count()
+        return self._get_stats(obj)['nb_cloturees']
 
     def get_nb_ecritures_brouillon(self, obj):
-        if hasattr(obj, 'ecritures'):
-            return obj.ecritures.filter(statut='BROUILLON').count()
-        return 0
+        return self._get_stats(obj)['nb_brouillon']
 
     def get_nb_ecritures_validees(self, obj):
-        if hasattr(obj, 'ecritures'):
-            return obj.ecritures.filter(statut='VALIDEE').count()
-        return 0
+        return self._get_stats(obj)['nb_validees']
 
     def get_montant_total_debits(self, obj):
-        """Somme totale des débits de l'exercice"""
-        if hasattr(obj, 'ecritures'):
-            from django.db.models import Sum
-            total = obj.ecritures.aggregate(
-                total=Sum('lignes__montant_debit')
-            )['total']
-            return float(total or 0)
-        return 0
+        """Somme totale des débits de l'exercice (0 garanti par Coalesce)"""
+        return float(self._get_stats(obj)['total_debits'])
 
     def get_montant_total_credits(self, obj):
-        """Somme totale des crédits de l'exercice"""
-        if hasattr(obj, 'ecritures'):
-            from django.db.models import Sum
-            total = obj.ecritures.aggregate(
-                total=Sum('lignes__montant_credit')
-            )['total']
-            return float(total or 0)
-        return 0
+        """Somme totale des crédits de l'exercice (0 garanti par Coalesce)"""
+        return float(self._get_stats(obj)['total_credits'])
 
     def get_ecart_debit_credit(self, obj):
         """Écart entre débits et crédits (doit être 0)"""
@@ -428,6 +494,9 @@ class ClotureExerciceSerializer(serializers.Serializer):
         except ExerciceComptable.DoesNotExist:
             raise serializers.ValidationError("Exercice introuvable")
 
+        # Conserver l'instance pour validate() et la vue : un seul fetch
+        self._exercice = exercice
+
         if exercice.statut == 'CLOTURE':
             raise serializers.ValidationError("Cet exercice est déjà clôturé")
 
@@ -451,7 +520,9 @@ class ClotureExerciceSerializer(serializers.Serializer):
 
     def validate(self, attrs):
         """Validations croisées"""
-        exercice = ExerciceComptable.objects.get(id=attrs['exercice_id'])
+        exercice = getattr(self, '_exercice', None)
+        if exercice is None:
+            exercice = ExerciceComptable.objects.get(id=attrs['exercice_id'])
 
         # Si pas de date fournie, utiliser la date du jour
         if 'date_cloture' not in attrs:
@@ -6,10 +6,114 @@ Serializers pour les tiers (auxiliaires) OHADA
 - Validation des comptes collectifs
 """
 
+import copy
+from functools import cached_property
+
 from rest_framework import serializers
-from apps.accounting.models import Tiers, CompteOHADA
+from django.core.cache import cache
+from django.db.models import CharField, Count, F, Manager, Prefetch, Q, Sum, Value, Window
+from django.db.models.functions import Concat, RowNumber
+from django.utils import timezone
+
+from django.db import IntegrityError, connection
+
+from apps.accounting.models import Tiers, CompteOHADA, LigneEcriture
 from .base import CompteOHADAMinimalSerializer
 
+# Formatage des montants : le format() pré-lié évite une recherche de
+# méthode par ligne, et translate() remplace les virgules par des espaces
+# en une seule passe C
+_FMT_MONTANT = "{:,.2f}".format
+_VIRGULE_VERS_ESPACE = str.maketrans({',': ' '})
+
+# Libellés des types : accès dict O(1) au lieu du parcours des choices
+# que fait get_type_tiers_display() à chaque ligne
+_TYPE_DISPLAY = dict(Tiers.TYPES_TIERS)
+
+# Types de tiers pré-calculés : tests d'appartenance O(1) sur les
+# chemins de validation, parcourus à chaque écriture
+_VALID_TYPES = frozenset(choice[0] for choice in Tiers.TYPES_TIERS)
+_VALID_TYPES_MSG = ', '.join(sorted(_VALID_TYPES))
+_CLIENT_TYPES = frozenset(('CLOC', 'CGRP'))
+_FOURNISSEUR_TYPES = frozenset(('FLOC', 'FGRP'))
+
+
+# Messages renvoyés quand la contrainte UNIQUE correspondante est violée
+_INTEGRITY_MESSAGES = {
+    'numero_contribuable': "Ce numéro de contribuable est déjà utilisé",
+    'matricule': "Ce matricule est déjà utilisé",
+}
+
+# Validateurs auto-générés désactivés sur les champs uniques : l'unicité
+# est garantie par les contraintes UNIQUE (violations traduites via
+# _relever_violation_unicite), sans exists() préalable par champ
+_SANS_UNIQUE_VALIDATOR = {
+    'matricule': {'validators': []},
+    'numero_contribuable': {'validators': []},
+}
+
+
+def _relever_violation_unicite(exc):
+    """Traduit une violation de contrainte UNIQUE en erreur de champ"""
+    message = str(exc.__cause__ or exc)
+    for champ, erreur in _INTEGRITY_MESSAGES.items():
+        if champ in message:
+            raise serializers.ValidationError({champ: erreur})
+    raise
+
+
+class TiersListSerializer(serializers.ListSerializer):
+    """
+    Serializer de liste pour les imports en masse de tiers
+
+    L'unicité de numero_contribuable et matricule est vérifiée avec une
+    seule requête par champ pour tout le lot, au lieu d'une par ligne :
+    les UniqueValidator auto-générés des enfants sont désactivés
+    (_SANS_UNIQUE_VALIDATOR), ce contrôle groupé est donc le seul qui
+    touche la base avant l'insertion.
+    """
+
+    def validate(self, attrs):
+        numeros = [a['numero_contribuable'] for a in attrs if a.get('numero_contribuable')]
+        matricules = [a['matricule'] for a in attrs if a.get('matricule')]
+
+        numeros_existants = set(
+            Tiers.objects.filter(
+                numero_contribuable__in=numeros
+            ).values_list('numero_contribuable', flat=True)
+        ) if numeros else set()
+        matricules_existants = set(
+            Tiers.objects.filter(
+                matricule__in=matricules
+            ).values_list('matricule', flat=True)
+        ) if matricules else set()
+
+        erreurs = []
+        for ligne in attrs:
+            erreurs_ligne = {}
+
+            numero = ligne.get('numero_contribuable')
+            if numero:
+                if numero in numeros_existants:
+                    erreurs_ligne['numero_contribuable'] = (
+                        _INTEGRITY_MESSAGES['numero_contribuable']
+                    )
+                # Détecte aussi les doublons internes au lot
+                numeros_existants.add(numero)
+
+            matricule = ligne.get('matricule')
+            if matricule:
+                if matricule in matricules_existants:
+                    erreurs_ligne['matricule'] = _INTEGRITY_MESSAGES['matricule']
+                matricules_existants.add(matricule)
+
+            erreurs.append(erreurs_ligne)
+
+        if any(erreurs):
+            raise serializers.ValidationError(erreurs)
+
+        return attrs
+
 
 class TiersSerializer(serializers.ModelSerializer):
     """
@@ -29,14 +133,23 @@ class TiersSerializer(serializers.ModelSerializer):
     )
 
     # Champs calculés
-    type_display = serializers.CharField(source='get_type_tiers_display', read_only=True)
+    type_display = serializers.SerializerMethodField()
     solde_comptable_formate = serializers.SerializerMethodField()
     age_creation = serializers.SerializerMethodField()
-    status_display = serializers.SerializerMethodField()
+    status_display = serializers.ReadOnlyField()
 
-    # Champs de commodité pour l'affichage
-    tiers_complet = serializers.SerializerMethodField()
-    identite_complete = serializers.SerializerMethodField()
+    # Champs de commodité pour l'affichage, exposés par le modèle
+    # (cached_property) ou annotés en SQL : lecture directe sans dispatch
+    tiers_complet = serializers.ReadOnlyField()
+    identite_complete = serializers.ReadOnlyField()
+
+    # Colonnes texte larges, différables sur les listes où elles ne sont
+    # pas rendues (defer côté queryset + retrait des champs)
+    DEFERRABLE_TEXT_FIELDS = ('notes', 'motif_blocage', 'adresse', 'numero_compte_bancaire')
+
+    # Construction des champs mémorisée au niveau classe : l'introspection
+    # du modèle (ModelSerializer.get_fields) est payée une seule fois
+    _fields_cache = None
 
     class Meta:
         model = Tiers
@@ -101,90 +214,84 @@ class TiersSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at'
         ]
+        extra_kwargs = _SANS_UNIQUE_VALIDATOR
+        list_serializer_class = TiersListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sur les listes, les colonnes texte larges sont différées par la
+        # vue : retirer les champs correspondants pour ne pas les re-charger
+        if self.context.get('defer_texts'):
+            for nom in self.DEFERRABLE_TEXT_FIELDS:
+                self.fields.pop(nom, None)
+
+    def get_fields(self):
+        """Mémorise l'introspection du modèle, copie fraîche à chaque instance"""
+        cls = type(self)
+        if cls._fields_cache is None:
+            cls._fields_cache = super().get_fields()
+        # deepcopy : chaque instance doit lier ses propres champs (bind)
+        return copy.deepcopy(cls._fields_cache)
+
+    @classmethod
+    def eager_load_queryset(cls, queryset):
+        """
+        Précharge les relations lues par le serializer
+
+        À appeler dans get_queryset() du viewset : les listes sont
+        rendues avec un JOIN au lieu d'une requête FK par tiers, et
+        tiers_complet est concaténé en SQL.
+        """
+        return queryset.select_related('compte_collectif', 'created_by').annotate(
+            tiers_complet=Concat(
+                'code', Value(' - '), 'raison_sociale',
+                output_field=CharField()
+            )
+        )
+
+    def get_type_display(self, obj):
+        """Libellé du type de tiers (table pré-calculée)"""
+        # À défaut de libellé connu, renvoyer le code brut plutôt que rien
+        return _TYPE_DISPLAY.get(obj.type_tiers, obj.type_tiers)
 
     def get_solde_comptable_formate(self, obj):
         """Retourne le solde formaté avec devise"""
         solde = obj.solde_comptable
-        if solde == 0:
+        if not solde:
             return "0,00 XAF"
 
         # Formater avec séparateurs de milliers
-        solde_formate = "{:,.2f}".format(abs(solde)).replace(',', ' ')
         signe = "+" if solde > 0 else "-"
+        return f"{signe}{_FMT_MONTANT(abs(solde)).translate(_VIRGULE_VERS_ESPACE)} XAF"
 
-        return f"{signe}{solde_formate} XAF"
+    @cached_property
+    def _today(self):
+        """Date du jour, injectée par la vue ou calculée une fois par instance"""
+        return self.context.get('today') or timezone.localdate()
 
     def get_age_creation(self, obj):
         """Nombre de jours depuis la création"""
-        from django.utils import timezone
-        delta = timezone.now().date() - obj.created_at.date()
-        return delta.days
-
-    def get_status_display(self, obj):
-        """Statut formaté avec icônes"""
-        statuts = []
-
-        if obj.is_active:
-            statuts.append("✓ Actif")
-        else:
-            statuts.append("✗ Inactif")
-
-        if obj.is_bloque:
-            statuts.append("🔒 Bloqué")
-
-        if obj.exonere_tva:
-            statuts.append("📋 Exonéré TVA")
-
-        return " | ".join(statuts)
-
-    def get_tiers_complet(self, obj):
-        """Code + raison sociale pour affichage"""
-        return f"{obj.code} - {obj.raison_sociale}"
-
-    def get_identite_complete(self, obj):
-        """Identité complète avec sigle et matricule"""
-        identite = obj.raison_sociale
-
-        if obj.sigle:
-            identite += f" ({obj.sigle})"
-
-        if obj.type_tiers == 'EMPL' and obj.matricule:
-            identite += f" - Mat: {obj.matricule}"
-
-        if obj.numero_contribuable:
-            identite += f" - N° Contrib: {obj.numero_contribuable}"
-
-        return identite
+        return (self._today - obj.created_at.date()).days
 
     def validate_type_tiers(self, value):
         """Validation du type de tiers"""
-        types_autorises = [choice[0] for choice in Tiers.TYPES_TIERS]
-
-        if value not in types_autorises:
+        if value not in _VALID_TYPES:
             raise serializers.ValidationError(
-                f"Type non autorisé. Types valides : {', '.join(types_autorises)}"
+                f"Type non autorisé. Types valides : {_VALID_TYPES_MSG}"
             )
 
         return value
 
-    def validate_numero_contribuable(self, value):
-        """Validation du numéro de contribuable (unique)"""
-        if value:
-            # Vérifier l'unicité si c'est une création ou modification
-            queryset = Tiers.objects.filter(numero_contribuable=value)
-            if self.instance:
-                queryset = queryset.exclude(pk=self.instance.pk)
-
-            if queryset.exists():
-                raise serializers.ValidationError(
-                    "Ce numéro de contribuable est déjà utilisé"
-                )
-
-        return value
+    def to_internal_value(self, data):
+        """Mémorise type_tiers avant validation : plusieurs validateurs le lisent"""
+        # Une seule lecture du payload (potentiellement un QueryDict à
+        # parser) au lieu d'une par validateur de champ
+        self._type_tiers_initial = data.get('type_tiers')
+        return super().to_internal_value(data)
 
     def validate_matricule(self, value):
         """Validation du matricule employé"""
-        type_tiers = self.initial_data.get('type_tiers')
+        type_tiers = self._type_tiers_initial
 
         # Matricule obligatoire pour les employés
         if type_tiers == 'EMPL' and not value:
@@ -198,28 +305,21 @@ class TiersSerializer(serializers.ModelSerializer):
                 "Le matricule est réservé aux employés"
             )
 
-        # Vérifier l'unicité
-        if value:
-            queryset = Tiers.objects.filter(matricule=value)
-            if self.instance:
-                queryset = queryset.exclude(pk=self.instance.pk)
-
-            if queryset.exists():
-                raise serializers.ValidationError("Ce matricule est déjà utilisé")
-
         return value
 
     def validate_plafond_credit(self, value):
         """Validation du plafond de crédit"""
-        type_tiers = self.initial_data.get('type_tiers')
+        # Court-circuit : rien à vérifier sans plafond (PATCH partiels)
+        if not value:
+            return value
 
         # Plafond seulement pour les clients
-        if value and type_tiers not in ['CLOC', 'CGRP']:
+        if self._type_tiers_initial not in _CLIENT_TYPES:
             raise serializers.ValidationError(
                 "Le plafond de crédit est réservé aux clients"
             )
 
-        if value and value <= 0:
+        if value <= 0:
             raise serializers.ValidationError(
                 "Le plafond de crédit doit être positif"
             )
@@ -228,7 +328,10 @@ class TiersSerializer(serializers.ModelSerializer):
 
     def validate_delai_paiement(self, value):
         """Validation du délai de paiement"""
-        if value is not None and (value < 0 or value > 365):
+        if value is None:
+            return value
+
+        if value < 0 or value > 365:
             raise serializers.ValidationError(
                 "Le délai de paiement doit être entre 0 et 365 jours"
             )
@@ -240,10 +343,10 @@ class TiersSerializer(serializers.ModelSerializer):
         type_tiers = attrs.get('type_tiers')
 
         # Validations spécifiques par type
-        if type_tiers in ['CLOC', 'CGRP']:  # Clients
+        if type_tiers in _CLIENT_TYPES:  # Clients
             # Les clients peuvent avoir un plafond de crédit
             pass
-        elif type_tiers in ['FLOC', 'FGRP']:  # Fournisseurs
+        elif type_tiers in _FOURNISSEUR_TYPES:  # Fournisseurs
             # Pas de plafond pour les fournisseurs
             if attrs.get('plafond_credit'):
                 attrs['plafond_credit'] = None
@@ -255,6 +358,20 @@ class TiersSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    def create(self, validated_data):
+        """Création : l'unicité est garantie par les contraintes UNIQUE"""
+        try:
+            return super().create(validated_data)
+        except IntegrityError as exc:
+            _relever_violation_unicite(exc)
+
+    def update(self, instance, validated_data):
+        """Mise à jour : l'unicité est garantie par les contraintes UNIQUE"""
+        try:
+            return super().update(instance, validated_data)
+        except IntegrityError as exc:
+            _relever_violation_unicite(exc)
+
 
 class TiersMinimalSerializer(serializers.ModelSerializer):
     """
@@ -262,8 +379,12 @@ class TiersMinimalSerializer(serializers.ModelSerializer):
     Utilisé dans les relations avec les écritures
     """
 
-    type_display = serializers.CharField(source='get_type_tiers_display', read_only=True)
-    tiers_complet = serializers.SerializerMethodField()
+    type_display = serializers.SerializerMethodField()
+    tiers_complet = serializers.ReadOnlyField()
+
+    # Construction des champs mémorisée au niveau classe : les champs de
+    # ce serializer sont statiques et il est instancié sur des chemins chauds
+    _fields_cache = None
 
     class Meta:
         model = Tiers
@@ -278,9 +399,110 @@ class TiersMinimalSerializer(serializers.ModelSerializer):
             'is_active',
             'is_bloque'
         ]
+        # Serializer de lecture pure : aucun validateur de champ à
+        # construire (les champs déclarés sont déjà read-only)
+        read_only_fields = [
+            'id', 'code', 'type_tiers', 'raison_sociale',
+            'sigle', 'is_active', 'is_bloque'
+        ]
+
+    def get_fields(self):
+        """Mémorise l'introspection du modèle, copie fraîche à chaque instance"""
+        cls = type(self)
+        if cls._fields_cache is None:
+            cls._fields_cache = super().get_fields()
+        # deepcopy : chaque instance doit lier ses propres champs (bind)
+        return copy.deepcopy(cls._fields_cache)
+
+    def get_type_display(self, obj):
+        """Libellé du type de tiers (table pré-calculée)"""
+        # À défaut de libellé connu, renvoyer le code brut plutôt que rien
+        return _TYPE_DISPLAY.get(obj.type_tiers, obj.type_tiers)
+
+    @classmethod
+    def eager_load_queryset(cls, queryset):
+        """Projette uniquement les colonnes rendues par le serializer minimal"""
+        # updated_at ne fait pas partie de la sortie mais sert de clé de
+        # cache à la variante TiersMinimalCachedSerializer
+        return queryset.only(
+            'id', 'code', 'type_tiers', 'raison_sociale',
+            'sigle', 'is_active', 'is_bloque', 'updated_at'
+        ).annotate(
+            tiers_complet=Concat(
+                'code', Value(' - '), 'raison_sociale',
+                output_field=CharField()
+            )
+        )
 
-    def get_tiers_complet(self, obj):
-        return f"{obj.code} - {obj.raison_sociale}"
+
+# Durée de vie du cache des représentations minimales : la clé inclut
+# updated_at (invalidation naturelle à chaque modification), le TTL court
+# sert uniquement à borner l'occupation du cache
+_TTL_CACHE_MINIMAL = 300
+
+
+def _cle_cache_minimal(obj):
+    """Clé de cache d'une représentation minimale, liée à (pk, updated_at)"""
+    # Préfixée par le schéma du tenant : le cache est partagé entre
+    # tenants et deux Tiers homonymes (même pk, même updated_at) ne
+    # doivent jamais se servir mutuellement leur représentation
+    return (
+        f"{connection.schema_name}:tiers:min:"
+        f"{obj.pk}:{obj.updated_at.timestamp()}"
+    )
+
+
+class TiersMinimalCacheListSerializer(serializers.ListSerializer):
+    """
+    Liste de représentations minimales servie depuis le cache applicatif
+
+    Un get_many unique récupère les dicts déjà rendus ; seuls les tiers
+    absents du cache (ou modifiés depuis) repassent par le rendu DRF,
+    puis sont réinsérés en un set_many.
+    """
+
+    def to_representation(self, data):
+        objets = list(data.all() if isinstance(data, Manager) else data)
+        cles = [_cle_cache_minimal(obj) for obj in objets]
+        trouves = cache.get_many(cles)
+
+        resultats = []
+        manquants = {}
+        for obj, cle in zip(objets, cles):
+            representation = trouves.get(cle)
+            if representation is None:
+                # Rendu réel du parent, sans repasser par la relecture
+                # du cache que fait le child pour un objet isolé
+                representation = TiersMinimalSerializer.to_representation(
+                    self.child, obj
+                )
+                manquants[cle] = representation
+            resultats.append(representation)
+
+        if manquants:
+            cache.set_many(manquants, timeout=_TTL_CACHE_MINIMAL)
+
+        return resultats
+
+
+class TiersMinimalCachedSerializer(TiersMinimalSerializer):
+    """
+    Variante de TiersMinimalSerializer avec cache par (pk, updated_at)
+
+    Les listes déroulantes rechargent les mêmes tiers à chaque requête :
+    en cas de hit, le rendu des champs DRF est entièrement court-circuité.
+    """
+
+    class Meta(TiersMinimalSerializer.Meta):
+        list_serializer_class = TiersMinimalCacheListSerializer
+
+    def to_representation(self, instance):
+        cle = _cle_cache_minimal(instance)
+        representation = cache.get(cle)
+        if representation is None:
+            representation = super().to_representation(instance)
+            cache.set(cle, representation, timeout=_TTL_CACHE_MINIMAL)
+        return representation
 
 
 class TiersCreationSerializer(serializers.ModelSerializer):
@@ -289,11 +511,9 @@ class TiersCreationSerializer(serializers.ModelSerializer):
     # Le code est généré automatiquement
     code = serializers.CharField(read_only=True)
 
-    # Le compte collectif est assigné automatiquement
-    compte_collectif_detail = CompteOHADAMinimalSerializer(
-        source='compte_collectif',
-        read_only=True
-    )
+    # Le compte collectif est assigné automatiquement et rendu directement
+    # sous sa forme détaillée (pas de post-traitement to_representation)
+    compte_collectif = CompteOHADAMinimalSerializer(read_only=True)
 
     # created_by est assigné automatiquement dans le ViewSet
     created_by = serializers.HiddenField(
@@ -303,7 +523,7 @@ class TiersCreationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tiers
         fields = [
-            'id', 'code', 'type_tiers', 'compte_collectif', 'compte_collectif_detail',
+            'id', 'code', 'type_tiers', 'compte_collectif',
             'raison_sociale', 'sigle', 'matricule',
             'numero_contribuable', 'rccm', 'adresse', 'ville', 'pays',
             'telephone', 'email', 'banque', 'numero_compte_bancaire',
@@ -311,7 +531,9 @@ class TiersCreationSerializer(serializers.ModelSerializer):
             'contact_principal', 'fonction_contact', 'notes',
             'is_active', 'is_bloque', 'created_by', 'created_at'
         ]
-        read_only_fields = ['code', 'compte_collectif', 'compte_collectif_detail', 'created_at', 'created_by']
+        read_only_fields = ['code', 'created_at', 'created_by']
+        extra_kwargs = _SANS_UNIQUE_VALIDATOR
+        list_serializer_class = TiersListSerializer
 
     def validate(self, attrs):
         """Validation des données"""
@@ -325,14 +547,12 @@ class TiersCreationSerializer(serializers.ModelSerializer):
 
         return attrs
 
-    def to_representation(self, instance):
-        """Personnaliser la représentation pour inclure les détails du compte"""
-        data = super().to_representation(instance)
-        # S'assurer que compte_collectif_detail est bien inclus
-        if 'compte_collectif_detail' in data and data['compte_collectif_detail']:
-            # Utiliser compte_collectif_detail au lieu de compte_collectif simple
-            data['compte_collectif'] = data['compte_collectif_detail']
-        return data
+    def create(self, validated_data):
+        """Création : l'unicité est garantie par les contraintes UNIQUE"""
+        try:
+            return super().create(validated_data)
+        except IntegrityError as exc:
+            _relever_violation_unicite(exc)
 
 
 class TiersStatsSerializer(serializers.ModelSerializer):
@@ -349,6 +569,10 @@ class TiersStatsSerializer(serializers.ModelSerializer):
     premiere_ecriture = serializers.SerializerMethodField()
     nb_factures_impayees = serializers.SerializerMethodField()
 
+    # Construction des champs mémorisée au niveau classe : l'introspection
+    # du modèle (ModelSerializer.get_fields) est payée une seule fois
+    _fields_cache = None
+
     class Meta:
         model = Tiers
         fields = [
@@ -368,71 +592,180 @@ class TiersStatsSerializer(serializers.ModelSerializer):
             'is_active',
             'is_bloque'
         ]
+        # Serializer de lecture pure : aucun validateur de champ à
+        # construire (les champs déclarés sont déjà read-only)
+        read_only_fields = [
+            'id', 'code', 'raison_sociale', 'type_tiers',
+            'delai_paiement', 'plafond_credit', 'is_active', 'is_bloque'
+        ]
+
+    @classmethod
+    def annotate_queryset(cls, queryset):
+        """
+        Annote le queryset avec les statistiques par tiers
+
+        À appeler dans get_queryset() du viewset : une liste de N tiers
+        est rendue avec 2 requêtes au lieu de ~6 par tiers.
+        """
+        today = timezone.now().date()
+        return queryset.only(
+            'id', 'code', 'raison_sociale', 'type_tiers',
+            'delai_paiement', 'plafond_credit', 'is_active', 'is_bloque',
+            # FK gardées dans la projection : le viewset combine cette
+            # projection avec un select_related, et Django refuse un
+            # champ à la fois différé et traversé par select_related
+            'compte_collectif', 'created_by'
+        ).annotate(
+            _nb_ecritures=Count('lignes_ecritures'),
+            _total_debit=Sum('lignes_ecritures__montant_debit'),
+            _total_credit=Sum('lignes_ecritures__montant_credit'),
+            _nb_factures_impayees=Count(
+                'lignes_ecritures',
+                filter=Q(
+                    lignes_ecritures__date_echeance__lt=today,
+                    lignes_ecritures__is_lettree=False
+                )
+            )
+        ).prefetch_related(
+            # Première et dernière ligne par tiers via ROW_NUMBER() :
+            # une requête fenêtrée par borne, sans rapatrier toutes les lignes
+            Prefetch(
+                'lignes_ecritures',
+                queryset=cls._lignes_bornes_queryset(ascendant=True),
+                to_attr='_premieres_lignes'
+            ),
+            Prefetch(
+                'lignes_ecritures',
+                queryset=cls._lignes_bornes_queryset(ascendant=False),
+                to_attr='_dernieres_lignes'
+            )
+        )
+
+    @staticmethod
+    def _lignes_bornes_queryset(ascendant):
+        """Queryset ne gardant que la ligne extrême de chaque tiers"""
+        ordre = F('created_at').asc() if ascendant else F('created_at').desc()
+        return LigneEcriture.objects.annotate(
+            _rang=Window(
+                RowNumber(),
+                partition_by=[F('tiers_id')],
+                order_by=ordre
+            )
+        ).filter(_rang=1).select_related('ecriture')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Statistiques mémorisées par objet : une seule requête pour
+        # nb_ecritures, total_debit, total_credit, solde_net et impayées
+        self._stats_cache = {}
+
+    def get_fields(self):
+        """Mémorise l'introspection du modèle, copie fraîche à chaque instance"""
+        cls = type(self)
+        if cls._fields_cache is None:
+            cls._fields_cache = super().get_fields()
+        # deepcopy : chaque instance doit lier ses propres champs (bind)
+        return copy.deepcopy(cls._fields_cache)
+
+    def _get_stats(self, obj):
+        """Statistiques du tiers : annotations, sinon un seul aggregate"""
+        key = id(obj)
+        stats = self._stats_cache.get(key)
+        if stats is None:
+            nb = getattr(obj, '_nb_ecritures', None)
+            debit = getattr(obj, '_total_debit', None)
+            credit = getattr(obj, '_total_credit', None)
+            impayees = getattr(obj, '_nb_factures_impayees', None)
+            if nb is None and debit is None and credit is None:
+                # Objet isolé sans annotations : toutes les statistiques
+                # en une seule passe sur les lignes du tiers
+                agg = obj.lignes_ecritures.aggregate(
+                    nb=Count('id'),
+                    debit=Sum('montant_debit'),
+                    credit=Sum('montant_credit'),
+                    impayees=Count(
+                        'id',
+                        filter=Q(date_echeance__lt=self._today, is_lettree=False)
+                    )
+                )
+                nb, impayees = agg['nb'], agg['impayees']
+                debit, credit = agg['debit'], agg['credit']
+            stats = self._stats_cache[key] = {
+                'nb': nb or 0,
+                'debit': float(debit or 0),
+                'credit': float(credit or 0),
+                'impayees': impayees,
+            }
+        return stats
 
     def get_nb_ecritures(self, obj):
         """Nombre de lignes d'écriture pour ce tiers"""
-        if hasattr(obj, 'lignes_ecritures'):
-            return obj.lignes_ecritures.count()
-        return 0
+        return self._get_stats(obj)['nb']
 
     def get_total_debit(self, obj):
         """Total des débits"""
-        if hasattr(obj, 'lignes_ecritures'):
-            from django.db.models import Sum
-            total = obj.lignes_ecritures.aggregate(
-                total=Sum('montant_debit')
-            )['total']
-            return float(total or 0)
-        return 0
+        return self._get_stats(obj)['debit']
 
     def get_total_credit(self, obj):
         """Total des crédits"""
-        if hasattr(obj, 'lignes_ecritures'):
-            from django.db.models import Sum
-            total = obj.lignes_ecritures.aggregate(
-                total=Sum('montant_credit')
-            )['total']
-            return float(total or 0)
-        return 0
+        return self._get_stats(obj)['credit']
 
     def get_solde_net(self, obj):
         """Solde net (débit - crédit)"""
-        return self.get_total_debit(obj) - self.get_total_credit(obj)
+        stats = self._get_stats(obj)
+        return stats['debit'] - stats['credit']
 
     def get_derniere_ecriture(self, obj):
         """Informations sur la dernière écriture"""
-        if hasattr(obj, 'lignes_ecritures'):
-            derniere_ligne = obj.lignes_ecritures.order_by('-created_at').first()
-            if derniere_ligne:
-                return {
-                    'date': derniere_ligne.ecriture.date_ecriture,
-                    'numero': derniere_ligne.ecriture.numero,
-                    'libelle': derniere_ligne.libelle,
-                    'montant': float(derniere_ligne.montant)
-                }
+        lignes = getattr(obj, '_dernieres_lignes', None)
+        if lignes is not None:
+            derniere_ligne = lignes[0] if lignes else None
+        else:
+            derniere_ligne = obj.lignes_ecritures.select_related(
+                'ecriture'
+            ).order_by('-created_at').first()
+
+        if derniere_ligne:
+            return {
+                'date': derniere_ligne.ecriture.date_ecriture,
+                'numero': derniere_ligne.ecriture.numero,
+                'libelle': derniere_ligne.libelle,
+                'montant': float(derniere_ligne.montant)
+            }
         return None
 
     def get_premiere_ecriture(self, obj):
         """Informations sur la première écriture"""
-        if hasattr(obj, 'lignes_ecritures'):
-            premiere_ligne = obj.lignes_ecritures.order_by('created_at').first()
-            if premiere_ligne:
-                return {
-                    'date': premiere_ligne.ecriture.date_ecriture,
-                    'numero': premiere_ligne.ecriture.numero,
-                    'libelle': premiere_ligne.libelle
-                }
+        lignes = getattr(obj, '_premieres_lignes', None)
+        if lignes is not None:
+            premiere_ligne = lignes[0] if lignes else None
+        else:
+            premiere_ligne = obj.lignes_ecritures.select_related(
+                'ecriture'
+            ).order_by('created_at').first()
+
+        if premiere_ligne:
+            return {
+                'date': premiere_ligne.ecriture.date_ecriture,
+                'numero': premiere_ligne.ecriture.numero,
+                'libelle': premiere_ligne.libelle
+            }
         return None
 
+    @cached_property
+    def _today(self):
+        """Date du jour, injectée par la vue ou calculée une fois par instance"""
+        return self.context.get('today') or timezone.localdate()
+
     def get_nb_factures_impayees(self, obj):
-        """Nombre de factures impayées (échéance dépassée)"""
-        if hasattr(obj, 'lignes_ecritures'):
-            from django.utils import timezone
-            return obj.lignes_ecritures.filter(
-                date_echeance__lt=timezone.now().date(),
+        """Nombre de factures impayées"""
+        impayees = self._get_stats(obj)['impayees']
+        if impayees is None:
+            impayees = obj.lignes_ecritures.filter(
+                date_echeance__lt=self._today,
                 is_lettree=False
             ).count()
-        return 0
+        return impayees
 
 
 class TiersByTypeSerializer(serializers.Serializer):
@@ -447,15 +780,18 @@ class TiersByTypeSerializer(serializers.Serializer):
     tiers_actifs = serializers.IntegerField()
     tiers_bloques = serializers.IntegerField()
     total_solde = serializers.DecimalField(max_digits=15, decimal_places=2)
+    pourcentage = serializers.FloatField(required=False)
 
     def to_representation(self, instance):
         """Formatage personnalisé"""
         data = super().to_representation(instance)
 
-        # Ajouter des métadonnées
-        data['pourcentage'] = round(
-            (data['count'] / instance.get('total_general', 1)) * 100, 2
-        ) if instance.get('total_general') else 0
+        # Pourcentage pré-calculé par la requête groupée si disponible,
+        # sinon dérivé du total général injecté par la vue
+        if data.get('pourcentage') is None:
+            data['pourcentage'] = round(
+                (data['count'] / instance.get('total_general', 1)) * 100, 2
+            ) if instance.get('total_general') else 0
 
         return data
 
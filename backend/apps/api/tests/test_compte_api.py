@@ -4,7 +4,7 @@ Tests pour le CompteOHADAViewSet
 À exécuter avec: python manage.py test apps.api.tests.test_compte_api
 """
 
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from django_tenants.utils import schema_context
@@ -20,77 +20,80 @@ class CompteOHADAViewSetTestCase(APITestCase):
 
     @classmethod
     def setUpTestData(cls):
-        """Configuration des données de test"""
+        """Configuration des données de test (une fois par classe)"""
         # Créer un tenant de test
         cls.tenant = Tenant.objects.get(schema_name='test_company')
 
-    def setUp(self):
-        """Configuration avant chaque test"""
-        # Créer et authentifier un utilisateur
+        # Utilisateur et comptes partagés par tous les tests : créés une
+        # seule fois, la transaction de classe gère l'isolation
         with schema_context('test_company'):
-            self.user = User.objects.create_user(
+            cls.user = User.objects.create_user(
                 username='testuser',
                 email='test@example.com',
                 password='testpass123'
             )
 
-            # Créer quelques comptes de test
-            self.compte1 = CompteOHADA.objects.create(
+            cls.compte1 = CompteOHADA.objects.create(
                 code='60100000',
                 libelle='Achats de marchandises',
                 classe='6',
                 type='charge'
             )
 
-            self.compte2 = CompteOHADA.objects.create(
+            cls.compte2 = CompteOHADA.objects.create(
                 code='70100000',
                 libelle='Ventes de marchandises',
                 classe='7',
                 type='produit'
             )
 
-        # Obtenir le token JWT
-        response = self.client.post('/api/token/', {
+        # Obtenir le token JWT une seule fois : chaque émission repasse
+        # par le hachage PBKDF2 du mot de passe, inutile de le payer par test
+        response = APIClient().post('/api/token/', {
             'username': 'testuser',
             'password': 'testpass123'
         })
-        self.token = response.data['access']
+        cls.token = response.data['access']
+
+    def setUp(self):
+        """Configuration avant chaque test"""
+        # Le client est recréé à chaque test, seul l'en-tête est à poser
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
 
+    # Les tests qui ne font que des requêtes HTTP n'ont pas besoin de
+    # schema_context : le middleware django-tenants positionne le schéma
+    # à partir de l'hôte de la requête
+
     def test_list_comptes(self):
         """Test de la liste des comptes"""
-        with schema_context('test_company'):
-            response = self.client.get('/api/comptes/')
+        response = self.client.get('/api/comptes/')
 
-            self.assertEqual(response.status_code, status.HTTP_200_OK)
-            self.assertIn('results', response.data)
-            self.assertGreaterEqual(len(response.data['results']), 2)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('results', response.data)
+        self.assertGreaterEqual(len(response.data['results']), 2)
 
     def test_retrieve_compte(self):
         """Test de récupération d'un compte"""
-        with schema_context('test_company'):
-            response = self.client.get(f'/api/comptes/{self.compte1.id}/')
+        response = self.client.get(f'/api/comptes/{self.compte1.id}/')
 
-            self.assertEqual(response.status_code, status.HTTP_200_OK)
-            self.assertEqual(response.data['code'], '60100000')
-            self.assertEqual(response.data['classe'], '6')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['code'], '60100000')
+        self.assertEqual(response.data['classe'], '6')
 
     def test_filter_par_classe(self):
         """Test du filtre par classe"""
-        with schema_context('test_company'):
-            response = self.client.get('/api/comptes/?classe=6')
+        response = self.client.get('/api/comptes/?classe=6')
 
-            self.assertEqual(response.status_code, status.HTTP_200_OK)
-            for compte in response.data['results']:
-                self.assertEqual(compte['classe'], '6')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for compte in response.data['results']:
+            self.assertEqual(compte['classe'], '6')
 
     def test_search_comptes(self):
         """Test de la recherche"""
-        with schema_context('test_company'):
-            response = self.client.get('/api/comptes/?search=marchandises')
+        response = self.client.get('/api/comptes/?search=marchandises')
 
-            self.assertEqual(response.status_code, status.HTTP_200_OK)
-            self.assertGreaterEqual(len(response.data['results']), 2)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(len(response.data['results']), 2)
 
     def test_comptes_actifs(self):
         """Test de l'endpoint des comptes actifs"""
@@ -108,78 +111,73 @@ class CompteOHADAViewSetTestCase(APITestCase):
 
     def test_comptes_par_classe(self):
         """Test du groupement par classe"""
-        with schema_context('test_company'):
-            response = self.client.get('/api/comptes/par-classe/')
+        response = self.client.get('/api/comptes/par-classe/')
 
-            self.assertEqual(response.status_code, status.HTTP_200_OK)
-            self.assertIn('classe_6', response.data)
-            self.assertIn('classe_7', response.data)
-            self.assertEqual(response.data['classe_6']['numero'], 6)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('classe_6', response.data)
+        self.assertIn('classe_7', response.data)
+        self.assertEqual(response.data['classe_6']['numero'], 6)
 
     def test_compte_stats(self):
         """Test des statistiques d'un compte"""
-        with schema_context('test_company'):
-            response = self.client.get(f'/api/comptes/{self.compte1.id}/stats/')
+        response = self.client.get(f'/api/comptes/{self.compte1.id}/stats/')
 
-            self.assertEqual(response.status_code, status.HTTP_200_OK)
-            self.assertIn('nb_lignes_ecritures', response.data)
-            self.assertIn('solde_debiteur', response.data)
-            self.assertIn('solde_crediteur', response.data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('nb_lignes_ecritures', response.data)
+        self.assertIn('solde_debiteur', response.data)
+        self.assertIn('solde_crediteur', response.data)
 
     def test_compte_mouvements(self):
         """Test des mouvements d'un compte"""
-        with schema_context('test_company'):
-            response = self.client.get(f'/api/comptes/{self.compte1.id}/mouvements/')
+        response = self.client.get(f'/api/comptes/{self.compte1.id}/mouvements/')
 
-            self.assertEqual(response.status_code, status.HTTP_200_OK)
-            self.assertIn('compte', response.data)
-            self.assertIn('totaux', response.data)
-            self.assertIn('mouvements', response.data)
-            self.assertIn('pagination', response.data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Enveloppe du paginateur DRF + contenu métier dans results
+        self.assertIn('count', response.data)
+        contenu = response.data['results']
+        self.assertIn('compte', contenu)
+        self.assertIn('totaux', contenu)
+        self.assertIn('mouvements', contenu)
 
     def test_search_endpoint(self):
         """Test de la recherche avancée"""
-        with schema_context('test_company'):
-            response = self.client.get('/api/comptes/search/?q=achat')
+        response = self.client.get('/api/comptes/search/?q=achat')
 
-            self.assertEqual(response.status_code, status.HTTP_200_OK)
-            self.assertIn('resultats', response.data)
-            self.assertIn('charge', response.data['resultats'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('resultats', response.data)
+        self.assertIn('charge', response.data['resultats'])
 
     def test_create_compte_invalid(self):
         """Test de création avec données invalides"""
-        with schema_context('test_company'):
-            data = {
-                'code': '123',  # Code trop court
-                'libelle': 'Test',
-                'classe': '1',
-                'type': 'actif'
-            }
+        data = {
+            'code': '123',  # Code trop court
+            'libelle': 'Test',
+            'classe': '1',
+            'type': 'actif'
+        }
 
-            response = self.client.post('/api/comptes/', data)
+        response = self.client.post('/api/comptes/', data)
 
-            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-            self.assertIn('code', response.data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('code', response.data)
 
     def test_update_compte(self):
         """Test de mise à jour d'un compte"""
-        with schema_context('test_company'):
-            data = {'libelle': 'Nouveau libellé'}
+        data = {'libelle': 'Nouveau libellé'}
 
-            response = self.client.patch(f'/api/comptes/{self.compte1.id}/', data)
+        response = self.client.patch(f'/api/comptes/{self.compte1.id}/', data)
 
-            self.assertEqual(response.status_code, status.HTTP_200_OK)
-            self.assertEqual(response.data['libelle'], 'Nouveau libellé')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['libelle'], 'Nouveau libellé')
 
     def test_cannot_update_code(self):
         """Test qu'on ne peut pas modifier le code"""
-        with schema_context('test_company'):
-            data = {'code': '60200000'}
+        data = {'code': '60200000'}
 
-            response = self.client.patch(f'/api/comptes/{self.compte1.id}/', data)
+        response = self.client.patch(f'/api/comptes/{self.compte1.id}/', data)
 
-            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-            self.assertIn('error', response.data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
 
     def test_unauthorized_access(self):
         """Test d'accès non autorisé"""
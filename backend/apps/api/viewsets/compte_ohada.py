@@ -4,13 +4,23 @@ ViewSet pour la gestion des comptes OHADA via API REST
 Gère les comptes du plan comptable avec filtres et recherche
 """
 
+import json
+from itertools import groupby
+from operator import attrgetter
+
 from rest_framework import viewsets, filters, status
+from rest_framework.utils.encoders import JSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_headers
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django_filters import FilterSet, CharFilter, BooleanFilter, ChoiceFilter
-from django.db.models import Q, Sum, Count, Prefetch
+from django_filters import FilterSet, CharFilter
+from django.db.models import F, Q, Sum, Count, Prefetch, Window
+from django.db.models.functions import Length, RowNumber
 from rest_framework.permissions import AllowAny
 from django.shortcuts import get_object_or_404
 from rest_framework.pagination import PageNumberPagination
@@ -22,6 +32,25 @@ from apps.accounting.serializers.base import (
     CompteOHADAStatsSerializer
 )
 
+# Libellés des classes du plan OHADA (table fixe, construite à l'import)
+_LIBELLE_CLASSE = {
+    1: "Ressources durables",
+    2: "Actif immobilisé",
+    3: "Actif circulant HAO",
+    4: "Tiers",
+    5: "Trésorerie",
+    6: "Charges des activités ordinaires",
+    7: "Produits des activités ordinaires",
+    8: "Autres charges et autres produits",
+    9: "Comptes des engagements hors bilan",
+}
+
+
+# Durée de cache des lectures de référentiel : le plan comptable mute
+# rarement, le TTL borne le délai de prise en compte d'une modification
+_TTL_CACHE_REFERENTIEL = 60 * 15
+
+
 class CompteOHADAPagination(PageNumberPagination):
     page_size = 100  # Afficher 100 comptes par page
     page_size_query_param = 'page_size'
@@ -30,19 +59,22 @@ class CompteOHADAPagination(PageNumberPagination):
 class CompteOHADAFilter(FilterSet):
     """Filtre personnalisé pour les comptes OHADA"""
 
-    code = CharFilter(field_name='code', lookup_expr='exact')
+    # Seuls les filtres non triviaux sont déclarés : les lookups exacts
+    # sont générés depuis Meta.fields, moitié moins de construction de
+    # FilterSet à chaque requête
     code_startswith = CharFilter(field_name='code', lookup_expr='startswith')
     code_contains = CharFilter(field_name='code', lookup_expr='contains')
     libelle = CharFilter(field_name='libelle', lookup_expr='icontains')
-    classe = CharFilter(field_name='classe', lookup_expr='exact')
-    type = CharFilter(field_name='type', lookup_expr='exact')
-    is_active = BooleanFilter(field_name='is_active')
-    ref = CharFilter(field_name='ref', lookup_expr='exact')
 
     class Meta:
         model = CompteOHADA
-        fields = ['code', 'code_startswith', 'code_contains', 'libelle',
-                  'classe', 'type', 'is_active', 'ref']
+        fields = {
+            'code': ['exact'],
+            'classe': ['exact'],
+            'type': ['exact'],
+            'is_active': ['exact'],
+            'ref': ['exact'],
+        }
 
 
 class CompteOHADAViewSet(viewsets.ModelViewSet):
@@ -77,7 +109,10 @@ class CompteOHADAViewSet(viewsets.ModelViewSet):
 
     def get_serializer_class(self):
         """Retourne le serializer approprié selon l'action"""
-        if self.action == 'list' and self.request.query_params.get('minimal'):
+        # Mêmes actions que la projection only() de get_queryset : le
+        # serializer complet sur un queryset projeté re-chargerait chaque
+        # colonne différée par une requête par ligne
+        if self.action in ('list', 'actifs', 'all') and self.request.query_params.get('minimal'):
             return CompteOHADAMinimalSerializer
         elif self.action in ['stats', 'mouvements']:
             return CompteOHADAStatsSerializer
@@ -93,26 +128,44 @@ class CompteOHADAViewSet(viewsets.ModelViewSet):
         # Filtres additionnels via query params
         params = self.request.query_params
 
-        # Filtre par classe multiple
-        classes = params.get('classes', '').split(',')
-        if classes and classes[0]:
-            queryset = queryset.filter(classe__in=classes)
+        # Filtre par classe multiple (split uniquement si le paramètre
+        # est présent, en ignorant les virgules parasites)
+        if (brut := params.get('classes')):
+            classes = [c for c in brut.split(',') if c]
+            if classes:
+                queryset = queryset.filter(classe__in=classes)
 
         # Filtre par type multiple
-        types = params.get('types', '').split(',')
-        if types and types[0]:
-            queryset = queryset.filter(type__in=types)
-
-        # Filtre par niveau (longueur du code)
+        if (brut := params.get('types')):
+            types = [t for t in brut.split(',') if t]
+            if types:
+                queryset = queryset.filter(type__in=types)
+
+        # Filtres par niveau / comptes principaux : les codes font
+        # 8 chiffres, le niveau se traduit par un suffixe de zéros
+        # (LIKE, sans moteur regex côté base)
         niveau = params.get('niveau')
+        principaux = params.get('principaux_seulement') == 'true'
+        if niveau or principaux:
+            queryset = queryset.annotate(_code_len=Length('code')).filter(_code_len=8)
+
         if niveau:
-            # Niveau 1: 2 chiffres, Niveau 2: 4 chiffres, etc.
+            # Niveau 1: 2 chiffres significatifs, niveau 2: 4, etc.
             longueur = int(niveau) * 2
-            queryset = queryset.filter(code__regex=f'^[0-9]{{{longueur}}}0*$')
+            queryset = queryset.filter(code__endswith='0' * max(8 - longueur, 0))
+
+        if principaux:
+            # Au moins deux zéros finaux (équivalent de ^[0-9]{2,6}0+$)
+            queryset = queryset.filter(code__endswith='00')
 
-        # Filtre pour exclure les comptes de niveau détail
-        if params.get('principaux_seulement') == 'true':
-            queryset = queryset.filter(code__regex=r'^[0-9]{2,6}0+$')
+        # Projection sur les chemins de lecture : aucune FK à précharger
+        # sur CompteOHADA, mais note (TextField) n'est rendue par aucun
+        # serializer de liste et le serializer minimal ne lit que 5 colonnes
+        if self.action in ['list', 'actifs', 'all', 'search']:
+            if params.get('minimal'):
+                queryset = queryset.only('id', 'code', 'libelle', 'type', 'classe')
+            else:
+                queryset = queryset.defer('note')
 
         # Préchargement pour optimisation
         if self.action in ['stats', 'mouvements']:
@@ -131,21 +184,46 @@ class CompteOHADAViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
+    @method_decorator(cache_page(_TTL_CACHE_REFERENTIEL))
+    @method_decorator(vary_on_headers('Authorization'))
     def par_classe(self, request):
-        """Retourne les comptes groupés par classe"""
-        comptes_par_classe = {}
+        """Retourne les comptes groupés par classe (réponse mise en cache)"""
+        queryset = self.get_queryset()
+
+        # Une seule requête groupée pour les compteurs de toutes les
+        # classes, au lieu d'un exists() + count() par classe
+        compteurs = dict(
+            queryset.values_list('classe').annotate(nb=Count('id'))
+        )
+
+        # Échantillon : les 10 premiers comptes de chaque classe en une
+        # seule requête fenêtrée (ROW_NUMBER par classe)
+        echantillons = {}
+        fenetre = queryset.annotate(
+            _rang=Window(
+                RowNumber(),
+                partition_by=[F('classe')],
+                order_by=F('code').asc()
+            )
+        ).filter(_rang__lte=10)
+        for compte in fenetre:
+            echantillons.setdefault(compte.classe, []).append(compte)
 
+        comptes_par_classe = {}
         for classe in range(1, 10):
             classe_str = str(classe)
-            comptes = self.get_queryset().filter(classe=classe_str)
-
-            if comptes.exists():
-                comptes_par_classe[f'classe_{classe}'] = {
-                    'numero': classe,
-                    'libelle': self._get_libelle_classe(classe),
-                    'nb_comptes': comptes.count(),
-                    'comptes': CompteOHADAMinimalSerializer(comptes[:10], many=True).data
-                }
+            nb_comptes = compteurs.get(classe_str)
+            if not nb_comptes:
+                continue
+
+            comptes_par_classe[f'classe_{classe}'] = {
+                'numero': classe,
+                'libelle': _LIBELLE_CLASSE.get(classe, f"Classe {classe}"),
+                'nb_comptes': nb_comptes,
+                'comptes': CompteOHADAMinimalSerializer(
+                    echantillons.get(classe_str, []), many=True
+                ).data
+            }
 
         return Response(comptes_par_classe)
 
@@ -181,12 +259,6 @@ class CompteOHADAViewSet(viewsets.ModelViewSet):
         # Ordre chronologique
         lignes = lignes.order_by('-ecriture__date_ecriture', '-ecriture__numero')
 
-        # Pagination manuelle
-        page_size = int(request.query_params.get('page_size', 20))
-        page = int(request.query_params.get('page', 1))
-        start = (page - 1) * page_size
-        end = start + page_size
-
         # Calculer les totaux
         totaux = lignes.aggregate(
             total_debit=Sum('montant_debit'),
@@ -194,26 +266,39 @@ class CompteOHADAViewSet(viewsets.ModelViewSet):
             nb_mouvements=Count('id')
         )
 
-        # Préparer la réponse
-        mouvements = []
-        for ligne in lignes[start:end]:
-            mouvements.append({
-                'id': ligne.id,
-                'date': ligne.ecriture.date_ecriture,
-                'numero_ecriture': ligne.ecriture.numero,
-                'journal': ligne.ecriture.journal.code,
-                'libelle': ligne.libelle,
-                'debit': float(ligne.montant_debit),
-                'credit': float(ligne.montant_credit),
+        # Préparer la réponse : values() rapatrie les scalaires joints
+        # directement, sans instancier les modèles LigneEcriture,
+        # EcritureComptable, Journal et Tiers de la page. La pagination
+        # est déléguée au paginateur configuré du viewset.
+        page_lignes = self.paginate_queryset(
+            lignes.values(
+                'id', 'ecriture__date_ecriture', 'ecriture__numero',
+                'ecriture__journal__code', 'libelle', 'montant_debit',
+                'montant_credit', 'tiers__code', 'tiers__raison_sociale',
+                'code_lettrage', 'is_lettree'
+            )
+        ) or []
+
+        mouvements = [
+            {
+                'id': ligne['id'],
+                'date': ligne['ecriture__date_ecriture'],
+                'numero_ecriture': ligne['ecriture__numero'],
+                'journal': ligne['ecriture__journal__code'],
+                'libelle': ligne['libelle'],
+                'debit': float(ligne['montant_debit'] or 0),
+                'credit': float(ligne['montant_credit'] or 0),
                 'tiers': {
-                    'code': ligne.tiers.code,
-                    'nom': ligne.tiers.raison_sociale
-                } if ligne.tiers else None,
-                'lettrage': ligne.code_lettrage,
-                'is_lettree': ligne.is_lettree
-            })
-
-        response_data = {
+                    'code': ligne['tiers__code'],
+                    'nom': ligne['tiers__raison_sociale']
+                } if ligne['tiers__code'] else None,
+                'lettrage': ligne['code_lettrage'],
+                'is_lettree': ligne['is_lettree']
+            }
+            for ligne in page_lignes
+        ]
+
+        return self.get_paginated_response({
             'compte': {
                 'code': compte.code,
                 'libelle': compte.libelle
@@ -228,15 +313,8 @@ class CompteOHADAViewSet(viewsets.ModelViewSet):
                 'total_credit': float(totaux['total_credit'] or 0),
                 'solde': float((totaux['total_debit'] or 0) - (totaux['total_credit'] or 0))
             },
-            'pagination': {
-                'page': page,
-                'page_size': page_size,
-                'total': lignes.count()
-            },
             'mouvements': mouvements
-        }
-
-        return Response(response_data)
+        })
 
     @action(detail=False, methods=['get'])
     def search(self, request):
@@ -249,42 +327,57 @@ class CompteOHADAViewSet(viewsets.ModelViewSet):
             return Response({'error': 'La recherche doit contenir au moins 2 caractères'},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        # Recherche par code ou libellé
-        queryset = self.get_queryset().filter(
+        # Recherche par code ou libellé (icontains s'appuie sur les
+        # index trigrammes de CompteOHADA)
+        comptes = self.get_queryset().filter(
             Q(code__icontains=query) |
             Q(libelle__icontains=query)
-        )
+        ).order_by('type', 'code')[:50]
 
-        # Limiter les résultats
-        queryset = queryset[:50]
-
-        # Grouper par type de compte
+        # Grouper par type de compte : tri SQL + groupby, une seule
+        # instanciation de serializer par groupe
         resultats = {
             'actif': [],
             'passif': [],
             'charge': [],
             'produit': []
         }
+        total = 0
 
-        for compte in queryset:
-            data = CompteOHADAMinimalSerializer(compte).data
-            resultats[compte.type].append(data)
+        for type_compte, groupe in groupby(comptes, key=attrgetter('type')):
+            groupe = list(groupe)
+            total += len(groupe)
+            resultats[type_compte] = CompteOHADAMinimalSerializer(
+                groupe, many=True
+            ).data
 
         return Response({
             'query': query,
-            'total': sum(len(v) for v in resultats.values()),
+            'total': total,
             'resultats': resultats
         })
 
     @action(detail=False, methods=['get'])
     def all(self, request):
-        """Retourne tous les comptes sans pagination"""
+        """Retourne tous les comptes sans pagination (réponse streamée)"""
         queryset = self.get_queryset().filter(is_active=True)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response({
-            'count': queryset.count(),
-            'results': serializer.data
-        })
+        serializer = self.get_serializer()
+
+        def flux():
+            # Une ligne à la fois : la mémoire reste bornée quel que
+            # soit le nombre de comptes, et le compteur remplace le
+            # COUNT supplémentaire qu'exigeait l'ancienne réponse
+            nb = 0
+            yield '{"results": ['
+            for compte in queryset.iterator(chunk_size=500):
+                prefixe = ',' if nb else ''
+                nb += 1
+                yield prefixe + json.dumps(
+                    serializer.to_representation(compte), cls=JSONEncoder
+                )
+            yield f'], "count": {nb}}}'
+
+        return StreamingHttpResponse(flux(), content_type='application/json')
 
     def create(self, request, *args, **kwargs):
         """Création d'un compte avec validation OHADA"""
@@ -333,32 +426,22 @@ class CompteOHADAViewSet(viewsets.ModelViewSet):
         """Suppression d'un compte (désactivation seulement)"""
         instance = self.get_object()
 
-        # Ne pas supprimer physiquement, juste désactiver
-        if instance.lignes_ecritures.exists():
+        # Ne pas supprimer physiquement, juste désactiver. UPDATE
+        # conditionnel : la garde "aucune écriture" et l'écriture sont
+        # fusionnées en une seule requête atomique (pas de fenêtre entre
+        # exists() et save())
+        desactives = CompteOHADA.objects.filter(
+            pk=instance.pk,
+            lignes_ecritures__isnull=True
+        ).update(is_active=False)
+
+        if not desactives:
             return Response(
                 {'error': 'Ce compte ne peut pas être supprimé car il est utilisé dans des écritures'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        instance.is_active = False
-        instance.save()
-
         return Response(
             {'message': f'Le compte {instance.code} a été désactivé'},
             status=status.HTTP_204_NO_CONTENT
         )
-
-    def _get_libelle_classe(self, classe):
-        """Retourne le libellé d'une classe de comptes"""
-        libelles = {
-            1: "Ressources durables",
-            2: "Actif immobilisé",
-            3: "Actif circulant HAO",
-            4: "Tiers",
-            5: "Trésorerie",
-            6: "Charges des activités ordinaires",
-            7: "Produits des activités ordinaires",
-            8: "Autres charges et autres produits",
-            9: "Comptes des engagements hors bilan"
-        }
-        return libelles.get(classe, f"Classe {classe}")
\ No newline at end of file
@@ -28,7 +28,8 @@ from io import StringIO
 
 from apps.accounting.models import (
     EcritureComptable, LigneEcriture, Journal,
-    ExerciceComptable, PeriodeComptable, CompteOHADA, Tiers
+    ExerciceComptable, PeriodeComptable, CompteOHADA, Tiers,
+    montant_en_cents
 )
 from apps.accounting.serializers import (
     EcritureComptableSerializer,
@@ -97,20 +98,8 @@ class EcritureComptableViewSet(viewsets.ModelViewSet):
             'lignes__tiers'
         )
 
-        # Annotations pour les totaux
-        queryset = queryset.annotate(
-            _total_debit=Coalesce(
-                Sum('lignes__montant_debit'),
-                Decimal('0'),
-                output_field=DecimalField()
-            ),
-            _total_credit=Coalesce(
-                Sum('lignes__montant_credit'),
-                Decimal('0'),
-                output_field=DecimalField()
-            ),
-            _nb_lignes=Count('lignes')
-        )
+        # Annotations pour les totaux (partagées avec le serializer)
+        queryset = EcritureComptableSerializer.annotate_queryset(queryset)
 
         # Filtres additionnels depuis les query params
         params = self.request.query_params
@@ -604,11 +593,11 @@ class EcritureComptableViewSet(viewsets.ModelViewSet):
             # Créer les écritures
             for numero, data in ecritures_data.items():
                 try:
-                    # Vérifier l'équilibre
+                    # Vérifier l'équilibre (comparaison en centimes entiers)
                     total_debit = sum(l['montant_debit'] for l in data['lignes'])
                     total_credit = sum(l['montant_credit'] for l in data['lignes'])
 
-                    if abs(total_debit - total_credit) >= 0.01:
+                    if abs(montant_en_cents(total_debit) - montant_en_cents(total_credit)) >= 1:
                         errors.append(
                             f"Écriture {numero} déséquilibrée: "
                             f"D={total_debit} C={total_credit}"
@@ -807,11 +796,12 @@ class EcritureComptableViewSet(viewsets.ModelViewSet):
         total_debit = sum(Decimal(str(l.get('montant_debit', 0))) for l in lignes)
         total_credit = sum(Decimal(str(l.get('montant_credit', 0))) for l in lignes)
         ecart = abs(total_debit - total_credit)
+        equilibree = abs(montant_en_cents(total_debit) - montant_en_cents(total_credit)) < 1
 
         return Response({
             'total_debit': total_debit,
             'total_credit': total_credit,
             'ecart': ecart,
-            'equilibree': ecart < 0.01,
-            'message': 'Écriture équilibrée' if ecart < 0.01 else f'Écart de {ecart}'
+            'equilibree': equilibree,
+            'message': 'Écriture équilibrée' if equilibree else f'Écart de {ecart}'
         })
\ No newline at end of file
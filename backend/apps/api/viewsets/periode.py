@@ -80,6 +80,9 @@ class PeriodeComptableViewSet(viewsets.ModelViewSet):
         # Préchargement pour optimisation
         queryset = queryset.select_related('exercice', 'cloture_par')
 
+        # Annotations pour les compteurs (partagées avec le serializer)
+        queryset = PeriodeComptableSerializer.annotate_queryset(queryset)
+
         # Filtrer par exercice si spécifié dans l'URL
         exercice_id = self.kwargs.get('exercice_id')
         if exercice_id:
@@ -9,14 +9,18 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import FilterSet, CharFilter, BooleanFilter, ChoiceFilter
-from django.db.models import Q, Sum, Count, F, DecimalField
+from django.db.models import Q, Sum, Count, F, DecimalField, Max, Value
 from django.db.models.functions import Coalesce
+from django.http import HttpResponseNotModified
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.http import http_date
 
 from apps.accounting.models import Tiers, LigneEcriture
 from apps.accounting.serializers.tiers import (
     TiersSerializer,
     TiersMinimalSerializer,
+    TiersMinimalCachedSerializer,
     TiersCreationSerializer,
     TiersStatsSerializer,
     BlocageDeblocageSerializer
@@ -58,7 +62,33 @@ class TiersFilter(FilterSet):
                   'is_bloque', 'ville', 'categorie', 'a_solde']
 
 
-class TiersViewSet(viewsets.ModelViewSet):
+class ConditionalListMixin:
+    """
+    GET conditionnel sur les listes
+
+    Un ETag dérivé de MAX(updated_at) — un aggregate bien moins cher que
+    la sérialisation — permet de répondre 304 aux clients dont la copie
+    est à jour, sans rendre la liste.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        derniere_maj = queryset.aggregate(m=Max('updated_at'))['m']
+
+        etag = None
+        if derniere_maj is not None:
+            etag = f'"{int(derniere_maj.timestamp())}"'
+            if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+                return HttpResponseNotModified()
+
+        response = super().list(request, *args, **kwargs)
+        if etag:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(derniere_maj.timestamp())
+        return response
+
+
+class TiersViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """
     ViewSet pour les tiers (clients, fournisseurs, employés)
 
@@ -97,13 +127,30 @@ class TiersViewSet(viewsets.ModelViewSet):
         if self.action == 'create':
             return TiersCreationSerializer
         elif self.action == 'list' and self.request.query_params.get('minimal'):
-            return TiersMinimalSerializer
+            # Variante avec cache applicatif : les listes déroulantes
+            # rechargent les mêmes tiers à chaque requête
+            return TiersMinimalCachedSerializer
         elif self.action in ['stats', 'balance']:
             return TiersStatsSerializer
         elif self.action in ['bloquer', 'debloquer']:
             return BlocageDeblocageSerializer
         return super().get_serializer_class()
 
+    def _textes_differes(self):
+        """Liste sans les colonnes texte larges, sauf ?include=notes"""
+        return (
+            self.action == 'list'
+            and 'notes' not in self.request.query_params.get('include', '')
+            and not self.request.query_params.get('minimal')
+        )
+
+    def get_serializer_context(self):
+        """Injecte la date du jour, partagée par toute la sérialisation"""
+        context = super().get_serializer_context()
+        context['today'] = timezone.localdate()
+        context['defer_texts'] = self._textes_differes()
+        return context
+
     def get_queryset(self):
         """
         Retourne le queryset filtré
@@ -111,8 +158,18 @@ class TiersViewSet(viewsets.ModelViewSet):
         """
         queryset = super().get_queryset()
 
-        # Préchargement pour optimisation
-        queryset = queryset.select_related('compte_collectif', 'created_by')
+        # Préchargement pour optimisation (délégué aux serializers)
+        if self.action == 'list' and self.request.query_params.get('minimal'):
+            queryset = TiersMinimalSerializer.eager_load_queryset(queryset)
+        else:
+            queryset = TiersSerializer.eager_load_queryset(queryset)
+            # Colonnes texte larges différées quand elles ne sont pas rendues
+            if self._textes_differes():
+                queryset = queryset.defer(*TiersSerializer.DEFERRABLE_TEXT_FIELDS)
+
+        # Annotations statistiques (partagées avec TiersStatsSerializer)
+        if self.action in ['stats', 'balance']:
+            queryset = TiersStatsSerializer.annotate_queryset(queryset)
 
         # Annoter avec le solde si demandé
         if self.request.query_params.get('with_solde'):
@@ -154,20 +211,32 @@ class TiersViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def par_type(self, request):
         """Retourne les tiers groupés par type"""
-        tiers_par_type = {}
+        # Une seule requête agrégée pour les compteurs de tous les types,
+        # au lieu de quatre requêtes par type
+        compteurs = {
+            ligne['type_tiers']: ligne
+            for ligne in Tiers.objects.values('type_tiers').annotate(
+                nb_tiers=Count('id'),
+                nb_actifs=Count('id', filter=Q(is_active=True)),
+                nb_bloques=Count('id', filter=Q(is_bloque=True))
+            )
+        }
 
+        tiers_par_type = {}
         for type_code, type_libelle in Tiers.TYPES_TIERS:
-            tiers = self.get_queryset().filter(type_tiers=type_code)
-
-            if tiers.exists():
-                tiers_par_type[type_code] = {
-                    'code': type_code,
-                    'libelle': type_libelle,
-                    'nb_tiers': tiers.count(),
-                    'nb_actifs': tiers.filter(is_active=True).count(),
-                    'nb_bloques': tiers.filter(is_bloque=True).count(),
-                    'tiers': TiersMinimalSerializer(tiers[:10], many=True).data
-                }
+            ligne = compteurs.get(type_code)
+            if not ligne:
+                continue
+
+            tiers = self.get_queryset().filter(type_tiers=type_code)[:10]
+            tiers_par_type[type_code] = {
+                'code': type_code,
+                'libelle': type_libelle,
+                'nb_tiers': ligne['nb_tiers'],
+                'nb_actifs': ligne['nb_actifs'],
+                'nb_bloques': ligne['nb_bloques'],
+                'tiers': TiersMinimalSerializer(tiers, many=True).data
+            }
 
         return Response(tiers_par_type)
 
@@ -213,7 +282,6 @@ class TiersViewSet(viewsets.ModelViewSet):
         tiers = self.get_object()
 
         # Calculer les statistiques
-        from django.db.models import Value, DecimalField
         stats = LigneEcriture.objects.filter(tiers=tiers).aggregate(
             nb_ecritures=Count('ecriture', distinct=True),
             total_debit=Coalesce(Sum('montant_debit'), Value(0, output_field=DecimalField())),
@@ -1,9 +1,31 @@
 # apps/core/middleware.py
+from django.core.cache import cache
 from django.db import connection
+from django_tenants.middleware.main import TenantMainMiddleware
 from django_tenants.utils import get_tenant_model, schema_context
 from django.conf import settings
 
 
+class CachedTenantMiddleware(TenantMainMiddleware):
+    """
+    Résolution domaine -> tenant mise en cache
+
+    Sans cache, chaque requête authentifiée paie un SELECT sur la table
+    des domaines avant même d'atteindre la vue. Le TTL court borne le
+    délai de prise en compte d'un changement de domaine.
+    """
+
+    TENANT_CACHE_TTL = 300
+
+    def get_tenant(self, domain_model, hostname):
+        cle = f"tenant:domaine:{hostname}"
+        tenant = cache.get(cle)
+        if tenant is None:
+            tenant = super().get_tenant(domain_model, hostname)
+            cache.set(cle, tenant, self.TENANT_CACHE_TTL)
+        return tenant
+
+
 class TenantDebugMiddleware:
     """
     Middleware pour gérer le tenant en développement
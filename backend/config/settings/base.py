@@ -58,7 +58,7 @@ SHARED_APPS = [
 INSTALLED_APPS = list(SHARED_APPS) + [app for app in TENANT_APPS if app not in SHARED_APPS]
 
 MIDDLEWARE = [
-    'django_tenants.middleware.main.TenantMainMiddleware',
+    'apps.core.middleware.CachedTenantMiddleware',
     'apps.core.middleware.TenantDebugMiddleware',  # Ajoutez cette ligne
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -111,6 +111,8 @@ TENANT_MODEL = "tenants.Tenant"
 TENANT_DOMAIN_MODEL = "tenants.Domain"
 PUBLIC_SCHEMA_NAME = 'public'
 SHOW_PUBLIC_IF_NO_TENANT_FOUND = False  # Ajoutez cette ligne
+# N'émettre SET search_path qu'au changement de schéma, pas à chaque curseur
+TENANT_LIMIT_SET_CALLS = True
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -50,7 +50,9 @@ function Exercices() {
   const loadExercices = async () => {
     try {
       setLoading(true);
-      const response = await exercicesService.getAll({ page_size: 100 });
+      // include=periodes : la page affiche les périodes imbriquées,
+      // qui ne sont plus rendues par défaut sur les listes
+      const response = await exercicesService.getAll({ page_size: 100, include: 'periodes' });
 
       if (response.data.results) {
         setExercices(response.data.results);
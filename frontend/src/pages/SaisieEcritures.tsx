@@ -90,7 +90,9 @@ function SaisieEcritures() {
       setComptes(comptesResponse.data.results || []);
 
       // Charger l'exercice en cours
-      const exerciceResponse = await exercicesService.getAll({ statut: 'OUVERT' });
+      // include=periodes : la sélection de période lit exercice.periodes,
+      // qui n'est plus rendu par défaut sur les listes
+      const exerciceResponse = await exercicesService.getAll({ statut: 'OUVERT', include: 'periodes' });
       if (exerciceResponse.data.results && exerciceResponse.data.results.length > 0) {
         const exercice = exerciceResponse.data.results[0];
         setExerciceId(exercice.id);